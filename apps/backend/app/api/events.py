@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-import json
 import asyncio
 import logging
-from typing import AsyncIterator, Optional
+from itertools import islice
+from typing import AsyncIterator
 
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 
+from app.logging_utils import REQUEST_ID_CTX
+from app.realtime.pubsub import Subscriber
+from app.realtime.sse import KEEPALIVE_FRAME
 from app.runtime import get_pubsub, get_store
 
 
@@ -16,15 +19,27 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["events"])
 
+# Coalesce replayed events into a single write (one ASGI send / TLS record) per chunk.
+_REPLAY_CHUNK = 16
 
-def _sse(event: str, data: dict, *, event_id: Optional[int] = None) -> str:
-    payload = json.dumps(data, ensure_ascii=False)
-    lines = []
-    if event_id is not None:
-        lines.append(f"id: {event_id}")
-    lines.append(f"event: {event}")
-    lines.append(f"data: {payload}")
-    return "\n".join(lines) + "\n\n"
+_KEEPALIVE_INTERVAL_S = 15.0
+
+
+async def _keepalive(sub: Subscriber) -> None:
+    """Push an SSE comment periodically so idle streams stay open."""
+    while True:
+        await asyncio.sleep(_KEEPALIVE_INTERVAL_S)
+        if not sub.pending():
+            # Only needed when nothing else is waiting to be sent.
+            sub.push(KEEPALIVE_FRAME)
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the client has gone away (single long-lived receive loop)."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
 
 
 @router.get("/sessions/{session_id}/events")
@@ -34,6 +49,8 @@ async def session_events(request: Request, session_id: str, after_id: int = 0):
     - Replays events from SQLite after `after_id`
     - Then streams new events from in-memory pubsub
     """
+    # Resolved once per request and captured by gen(). (Not `Depends(...)`: FastAPI would
+    # dispatch these sync getters to the threadpool on every request.)
     store = get_store()
     pubsub = get_pubsub()
 
@@ -52,35 +69,59 @@ async def session_events(request: Request, session_id: str, after_id: int = 0):
     )
 
     async def gen() -> AsyncIterator[bytes]:
-        # replay
-        replay = store.list_events(session_id, after_id=after_id, limit=500)
-        logger.debug("sse replay session_id=%s count=%d after_id=%s", session_id, len(replay), after_id)
-        for ev in replay:
-            if await request.is_disconnected():
-                logger.info("sse disconnected during replay session_id=%s", session_id)
-                return
-            yield _sse(ev.type, {"ts": ev.ts.isoformat(), "payload": ev.payload}, event_id=ev.id).encode(
-                "utf-8"
-            )
-
-        # live
-        sub = await pubsub.subscribe(session_id)
+        # Bind the request id once for every log line of this stream.
+        log_extra = {"request_id": REQUEST_ID_CTX.get()}
+        disconnected = asyncio.create_task(_wait_for_disconnect(request))
         try:
-            # Periodically wake up to detect disconnect and to keep the connection alive.
-            while True:
-                if await request.is_disconnected():
-                    logger.info("sse disconnected session_id=%s", session_id)
-                    return
-                try:
-                    msg = await asyncio.wait_for(sub.queue.get(), timeout=15.0)
-                except asyncio.TimeoutError:
-                    # SSE comment as keepalive
-                    yield b": keep-alive\n\n"
-                    continue
-                yield _sse(msg["type"], msg["data"], event_id=msg.get("id")).encode("utf-8")
+            # replay (rows are fetched lazily; memory stays bounded by the chunk size)
+            replay = store.iter_event_frames(session_id, after_id=after_id, limit=500)
+            replayed = 0
+            try:
+                while True:
+                    if disconnected.done():
+                        logger.info("sse disconnected during replay session_id=%s", session_id, extra=log_extra)
+                        return
+                    frames = list(islice(replay, _REPLAY_CHUNK))
+                    if not frames:
+                        break
+                    replayed += len(frames)
+                    yield b"".join(frames)
+                    # Let other tasks run between chunks of a long replay.
+                    await asyncio.sleep(0)
+            finally:
+                replay.close()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "sse replay session_id=%s count=%d after_id=%s",
+                    session_id,
+                    replayed,
+                    after_id,
+                    extra=log_extra,
+                )
+
+            # live
+            sub = await pubsub.subscribe(session_id)
+            keepalive = asyncio.create_task(_keepalive(sub))
+            # A disconnect wakes the reader through the same Event as new frames.
+            wakeup = sub.evt
+            disconnected.add_done_callback(lambda _t: wakeup.set())
+            try:
+                while True:
+                    await wakeup.wait()
+                    if disconnected.done():
+                        logger.info("sse disconnected session_id=%s", session_id, extra=log_extra)
+                        return
+                    # Frames are encoded once at append time and shared by every subscriber.
+                    # Everything buffered since the last wakeup goes out in one write.
+                    frames = sub.drain()
+                    if frames:
+                        yield b"".join(frames) if len(frames) > 1 else frames[0]
+            finally:
+                keepalive.cancel()
+                await pubsub.unsubscribe(session_id, sub)
+                logger.debug("sse unsubscribed session_id=%s", session_id, extra=log_extra)
         finally:
-            await pubsub.unsubscribe(session_id, sub)
-            logger.debug("sse unsubscribed session_id=%s", session_id)
+            disconnected.cancel()
 
     return StreamingResponse(gen(), media_type="text/event-stream")
 
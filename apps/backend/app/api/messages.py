@@ -3,10 +3,13 @@ from __future__ import annotations
 import asyncio
 import logging
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from app.models import PostMessageRequest, PostMessageResponse
 from app.pipeline.orchestrator import orchestrator
+from app.realtime.sse import json_bytes
 from app.runtime import get_store
 from app.storage.sqlite import utc_now
 
@@ -16,16 +19,34 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["messages"])
 
+# Validates the raw body with pydantic-core directly (no FastAPI body-param machinery).
+_REQ_ADAPTER = TypeAdapter(PostMessageRequest)
 
-@router.post("/sessions/{session_id}/messages", response_model=PostMessageResponse)
-async def post_message(
-    session_id: str,
-    req: PostMessageRequest,
-) -> PostMessageResponse:
+
+@router.post(
+    "/sessions/{session_id}/messages",
+    responses={200: {"model": PostMessageResponse}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": PostMessageRequest.model_json_schema()}},
+        }
+    },
+)
+async def post_message(session_id: str, request: Request) -> Response:
     """Append a user message and kick off pipeline processing.
 
+    The body is a `PostMessageRequest`; the response is a `PostMessageResponse`.
     The actual agent orchestration is implemented in `app.pipeline.orchestrator`.
     """
+    try:
+        req = _REQ_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        # Same 422 shape FastAPI produces for body params.
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        ) from e
+
     store = get_store()
     try:
         session = store.get_session(session_id)
@@ -33,12 +54,13 @@ async def post_message(
         logger.warning("post_message: session not found session_id=%s", session_id)
         raise HTTPException(status_code=404, detail=str(e)) from e
 
-    session.messages.append({"role": "user", "content": req.content})
+    store.append_message(session_id, "user", req.content)
     session.updated_at = utc_now()
     session.status = "running"
     store.save_session(session)
 
     # Fire-and-forget in the server event loop (demo).
+    # The task inherits REQUEST_ID_CTX from this request, so pipeline logs keep its request_id.
     task = asyncio.create_task(orchestrator.safe_run(session_id))
     logger.info(
         "post_message accepted session_id=%s content_chars=%d task=%s",
@@ -47,6 +69,9 @@ async def post_message(
         task.get_name(),
     )
 
-    return PostMessageResponse(session_id=session_id, accepted=True)
+    return Response(
+        content=json_bytes({"session_id": session_id, "accepted": True}),
+        media_type="application/json",
+    )
 
 
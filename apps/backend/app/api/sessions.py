@@ -1,31 +1,39 @@
 from __future__ import annotations
 
-import uuid
+import secrets
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
 from app.models import CreateSessionResponse, SessionReadResponse
+from app.realtime.sse import json_bytes
 from app.runtime import get_store
 
 
 router = APIRouter(prefix="/api", tags=["sessions"])
 
 
-@router.post("/sessions", response_model=CreateSessionResponse)
-def create_session() -> CreateSessionResponse:
+@router.post("/sessions", responses={200: {"model": CreateSessionResponse}})
+def create_session() -> Response:
     store = get_store()
-    session_id = uuid.uuid4().hex
+    # 32 hex chars, same shape as uuid4().hex without building a UUID object.
+    session_id = secrets.token_hex(16)
     store.create_session(session_id)
-    return CreateSessionResponse(session_id=session_id)
+    return Response(content=json_bytes({"session_id": session_id}), media_type="application/json")
 
 
-@router.get("/sessions/{session_id}", response_model=SessionReadResponse)
-def read_session(session_id: str) -> SessionReadResponse:
+@router.get("/sessions/{session_id}", responses={200: {"model": SessionReadResponse}})
+def read_session(session_id: str) -> Response:
+    """Return the session as `SessionReadResponse` JSON.
+
+    The state was validated when loaded from the store, so serialize it directly
+    instead of letting FastAPI re-validate and re-encode it via `response_model`.
+    """
     store = get_store()
     try:
         session = store.get_session(session_id)
     except KeyError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
-    return SessionReadResponse(session=session)
+    body = b'{"session":' + session.model_dump_json().encode("utf-8") + b"}"
+    return Response(content=body, media_type="application/json")
 
 
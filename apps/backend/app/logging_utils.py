@@ -8,26 +8,47 @@ Goals:
 
 from __future__ import annotations
 
+import atexit
 import contextvars
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
 
 REQUEST_ID_CTX: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
 
+# Bound once: the filter runs for every record (including uvicorn.access).
+_get_request_id = REQUEST_ID_CTX.get
+
 
 class RequestIdFilter(logging.Filter):
     """Inject request_id into every LogRecord (best-effort)."""
 
     def filter(self, record: logging.LogRecord) -> bool:  # noqa: A003 (Filter.filter)
+        # Callers that bound the id up front pass it via `extra=`; keep theirs.
+        if "request_id" in record.__dict__:
+            return True
         # Uvicorn / third-party logs also pass here; make sure attribute exists.
-        record.request_id = REQUEST_ID_CTX.get("-")
+        # The ContextVar default ("-") covers records outside a request.
+        record.request_id = _get_request_id()
         return True
 
 
+# Shared across configure_logging() calls (e.g. uvicorn reload) instead of rebuilt each time.
+_REQUEST_ID_FILTER = RequestIdFilter()
+_FORMATTER = logging.Formatter(
+    # Keep format compact but information-rich (module + line is very helpful for debugging).
+    fmt="%(asctime)s %(levelname)s %(name)s:%(lineno)d [rid=%(request_id)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+# Writes the rotating log file on a background thread (see configure_logging).
+_file_listener: Optional[QueueListener] = None
+
+
 def _parse_log_level(level_name: Optional[str]) -> int:
     if not level_name:
         return logging.INFO
@@ -44,17 +65,17 @@ def configure_logging() -> None:
     - FAIRY_DEMO_LOG_FILE: log file path (default: apps/backend/var/logs/backend.log)
     - FAIRY_DEMO_LOG_MAX_BYTES: rotate when file exceeds this size (default 10MB)
     - FAIRY_DEMO_LOG_BACKUP_COUNT: number of rotated files to keep (default 5)
+
+    File logging goes through a QueueHandler: the request path only enqueues the
+    record, and a QueueListener thread does the disk writes and rotation.
     """
+    global _file_listener
 
     level = _parse_log_level(os.getenv("FAIRY_DEMO_LOG_LEVEL", "INFO"))
 
-    # Keep format compact but information-rich (module + line is very helpful for debugging).
-    fmt = "%(asctime)s %(levelname)s %(name)s:%(lineno)d [rid=%(request_id)s] %(message)s"
-    datefmt = "%Y-%m-%d %H:%M:%S"
-
     root = logging.getLogger()
-    formatter = logging.Formatter(fmt=fmt, datefmt=datefmt)
-    request_id_filter = RequestIdFilter()
+    formatter = _FORMATTER
+    request_id_filter = _REQUEST_ID_FILTER
 
     if not root.handlers:
         # Default stream handler
@@ -68,8 +89,10 @@ def configure_logging() -> None:
         root.setLevel(level)
         for h in root.handlers:
             h.setLevel(level)
-            h.setFormatter(formatter)
-            if not any(isinstance(f, RequestIdFilter) for f in getattr(h, "filters", [])):
+            if not isinstance(h, QueueHandler):
+                # QueueHandler only pre-renders the message; the sink handler applies the format.
+                h.setFormatter(formatter)
+            if not any(isinstance(f, RequestIdFilter) for f in h.filters):
                 h.addFilter(request_id_filter)
 
     # Optional file logging (rotating).
@@ -89,10 +112,11 @@ def configure_logging() -> None:
 
             # Avoid adding duplicate file handlers on uvicorn reload.
             already = False
-            for h in root.handlers:
-                if isinstance(h, RotatingFileHandler):
+            if _file_listener is not None:
+                for h in _file_listener.handlers:
                     try:
                         if Path(getattr(h, "baseFilename", "")) == file_path:
+                            h.setLevel(level)
                             already = True
                             break
                     except Exception:
@@ -106,8 +130,18 @@ def configure_logging() -> None:
                 )
                 fh.setLevel(level)
                 fh.setFormatter(formatter)
-                fh.addFilter(request_id_filter)
-                root.addHandler(fh)
+                # request_id is stamped by the QueueHandler's filter in the emitting context;
+                # fh runs on the listener thread where REQUEST_ID_CTX is not set.
+                # SimpleQueue: unbounded, lock-free put (no task_done bookkeeping needed).
+                log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+                qh = QueueHandler(log_queue)
+                qh.setLevel(level)
+                qh.addFilter(request_id_filter)
+                _file_listener = QueueListener(log_queue, fh, respect_handler_level=True)
+                _file_listener.start()
+                # Flush queued records to disk on interpreter shutdown.
+                atexit.register(_file_listener.stop)
+                root.addHandler(qh)
 
     # Align common loggers with our level (format is handled by handlers above).
     logging.getLogger("uvicorn.error").setLevel(level)
@@ -3,7 +3,8 @@ from __future__ import annotations
 import logging
 import os
 import time
-import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
@@ -13,41 +14,59 @@ from app.api.events import router as events_router
 from app.api.messages import router as messages_router
 from app.api.sessions import router as sessions_router
 from app.logging_utils import REQUEST_ID_CTX, configure_logging
-from app.runtime import get_store
+from app.runtime import configure_thread_pool, get_store, preload
 
 
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    pool_size = configure_thread_pool()
+    logger.info("thread pool configured size=%d", pool_size)
+    # Pay the fairy/LangGraph import cost at startup rather than on the first pipeline run.
+    start = time.perf_counter()
+    preload()
+    logger.info("pipeline preload done duration_ms=%.1f", (time.perf_counter() - start) * 1000.0)
+    yield
+
+
 def create_app() -> FastAPI:
     load_dotenv()
     configure_logging()
 
-    app = FastAPI(title="Fairy Demo Backend", version="0.1.0")
+    app = FastAPI(
+        title="Fairy Demo Backend",
+        version="0.1.0",
+        lifespan=lifespan,
+    )
 
     # Ensure DB initialized
     get_store()
 
+    # Log level is fixed after configure_logging(); skip timing entirely when INFO is off.
+    info_on = logger.isEnabledFor(logging.INFO)
+
     @app.middleware("http")
     async def request_log_middleware(request, call_next):  # type: ignore[no-untyped-def]
-        rid = request.headers.get("x-request-id") or uuid.uuid4().hex
+        rid = request.headers.get("x-request-id") or os.urandom(16).hex()
         token = REQUEST_ID_CTX.set(rid)
-        start = time.perf_counter()
+        start = time.perf_counter() if info_on else None
 
         try:
             response = await call_next(request)
-            response.headers["X-Request-ID"] = rid
-            duration_ms = (time.perf_counter() - start) * 1000.0
-            logger.info(
-                "HTTP 完成 method=%s path=%s status=%s duration_ms=%.1f",
-                request.method,
-                request.url.path,
-                response.status_code,
-                duration_ms,
-            )
+            response.headers.raw.append((b"x-request-id", rid.encode("latin-1")))
+            if start is not None:
+                logger.info(
+                    "HTTP 完成 method=%s path=%s status=%s duration_ms=%.1f",
+                    request.method,
+                    request.url.path,
+                    response.status_code,
+                    (time.perf_counter() - start) * 1000.0,
+                )
             return response
         except Exception:
-            duration_ms = (time.perf_counter() - start) * 1000.0
+            duration_ms = (time.perf_counter() - start) * 1000.0 if start is not None else float("nan")
             logger.exception(
                 "HTTP 请求异常 method=%s path=%s query=%s duration_ms=%.1f",
                 request.method,
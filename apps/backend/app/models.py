@@ -74,6 +74,8 @@ class EventRecord(BaseModel):
     ts: datetime
     type: EventType
     payload: dict[str, Any] = Field(default_factory=dict)
+    # Pre-encoded SSE frame (shared across subscribers; not part of the API schema).
+    sse: bytes = Field(default=b"", exclude=True, repr=False)
 
 
 class EventEnvelope(BaseModel):
@@ -83,5 +85,6 @@ class EventEnvelope(BaseModel):
     type: EventType
     ts: datetime
     payload: dict[str, Any] = Field(default_factory=dict)
+    sse: bytes = Field(default=b"", exclude=True, repr=False)
 
 
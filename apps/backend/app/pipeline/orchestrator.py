@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import logging
 import sys
 import time
@@ -11,19 +12,32 @@ import anyio
 from langchain_core.messages import AIMessage, HumanMessage
 from pydantic import BaseModel, Field
 
-from app.runtime import get_pubsub, get_store
+from app.realtime.pubsub import CRITICAL_EVENT_TYPES
+from app.runtime import get_chat_model, get_pubsub, get_store
 from app.storage.sqlite import utc_now
 
 
 logger = logging.getLogger(__name__)
 
 
+_SYSPATH_DONE = False
+
+
 def _ensure_repo_root_on_syspath() -> None:
     """Allow `import fairy` when running backend without installing the root package."""
+    global _SYSPATH_DONE
+    if _SYSPATH_DONE:
+        return
     repo_root = Path(__file__).resolve().parents[4]
     src_root = repo_root / "src"
     if str(src_root) not in sys.path:
         sys.path.insert(0, str(src_root))
+    _SYSPATH_DONE = True
+
+
+# Once at import time; `fairy.*` itself is imported lazily in `run()` (and preloaded at
+# startup by `app.runtime.preload`) because importing it builds model clients.
+_ensure_repo_root_on_syspath()
 
 
 def _preview(text: str, n: int = 120) -> str:
@@ -31,74 +45,154 @@ def _preview(text: str, n: int = 120) -> str:
     return t if len(t) <= n else t[: n - 1] + "…"
 
 
+class Stage:
+    """Time one pipeline stage; logs `<name> done ... duration_ms=...` once on clean exit.
+
+    Extra log fields are attached with `note(...)` and only formatted when INFO is on.
+    """
+
+    __slots__ = ("name", "session_id", "start", "fields")
+
+    def __init__(self, name: str, session_id: str) -> None:
+        self.name = name
+        self.session_id = session_id
+        self.start = 0.0
+        self.fields: dict[str, Any] = {}
+
+    def __enter__(self) -> "Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None and logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "%s done session_id=%s duration_ms=%.1f%s",
+                self.name,
+                self.session_id,
+                self.elapsed() * 1000.0,
+                "".join(f" {k}={v}" for k, v in self.fields.items()),
+            )
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def note(self, **fields: Any) -> None:
+        self.fields.update(fields)
+
+
+# Stored chat role -> LangChain message class.
+_ROLE_MAP = {"user": HumanMessage, "assistant": AIMessage}
+
+
 class IntentDecision(BaseModel):
     is_research: bool = Field(description="是否应走 research 工作流（demo 里一般为 true）")
     intent_label: str = Field(description="简短的用户意图标签，例如：市场调研/竞品分析/学术综述/写作辅助")
 
 
+@functools.lru_cache(maxsize=1)
+def get_structured_intent_model() -> Any:
+    """Intent classifier runnable, built once (model client + structured-output binding)."""
+    return get_chat_model("gpt-4.1-mini").with_structured_output(IntentDecision)
+
+
 @dataclass(frozen=True)
 class Orchestrator:
     async def run(self, session_id: str) -> None:
-        _ensure_repo_root_on_syspath()
-
         store = get_store()
         pubsub = get_pubsub()
+        # Level is fixed after startup; skip building previews/key lists that would be discarded.
+        info_on = logger.isEnabledFor(logging.INFO)
+        debug_on = logger.isEnabledFor(logging.DEBUG)
+
+        # SQLite calls are blocking; run them in a worker thread so a slow commit doesn't
+        # stall the SSE fan-out or the heartbeat timer. Calls are awaited in order, so
+        # event ids stay monotonic.
+        async def commit(*items: tuple[str, dict[str, Any]]) -> None:
+            """Save the session and emit `items` with a single SQLite transaction and one fan-out."""
+            session.updated_at = utc_now()
+            evs = await anyio.to_thread.run_sync(store.save_session_with_events, session, items)
+            if not evs:
+                return
+            if debug_on:
+                logger.debug(
+                    "emit events session_id=%s event_ids=%s types=%s",
+                    session_id,
+                    [ev.id for ev in evs],
+                    [ev.type for ev in evs],
+                )
+            pubsub.publish_many(session_id, [(ev.sse, ev.type in CRITICAL_EVENT_TYPES) for ev in evs])
+
+        async def add_message(role: str, content: str) -> None:
+            session.messages.append({"role": role, "content": content})
+            await anyio.to_thread.run_sync(store.append_message, session_id, role, content)
 
         async def emit(type: str, payload: dict[str, Any]) -> None:
-            ev = store.append_event(session_id, type=type, payload=payload)
-            logger.debug(
-                "emit event session_id=%s event_id=%s type=%s payload_keys=%s",
-                session_id,
-                ev.id,
-                type,
-                list(payload.keys()),
+            ev = await anyio.to_thread.run_sync(
+                functools.partial(store.append_event, session_id, type=type, payload=payload)
             )
+            if debug_on:
+                logger.debug(
+                    "emit event session_id=%s event_id=%s type=%s payload_keys=%s",
+                    session_id,
+                    ev.id,
+                    type,
+                    list(payload.keys()),
+                )
             # publish to in-memory SSE subscribers (best-effort)
-            await pubsub.publish(
-                session_id,
-                {"id": ev.id, "type": ev.type, "data": {"ts": ev.ts.isoformat(), "payload": ev.payload}},
-            )
+            pubsub.publish(session_id, ev.sse, critical=type in CRITICAL_EVENT_TYPES)
 
         overall_start = time.perf_counter()
         try:
-            session = store.get_session(session_id)
+            session = await anyio.to_thread.run_sync(store.get_session, session_id)
         except KeyError:
             logger.warning("pipeline abort: session not found session_id=%s", session_id)
             return
 
-        # Find last user message for debugging (preview only)
-        last_user = ""
-        if session.messages:
+        if info_on:
+            # Find last user message for debugging (preview only)
+            last_user = ""
             for m in reversed(session.messages):
                 if m.get("role") == "user":
                     last_user = str(m.get("content", ""))
                     break
+            logger.info(
+                "pipeline start session_id=%s status=%s messages=%d last_user_preview=%s",
+                session_id,
+                session.status,
+                len(session.messages),
+                _preview(last_user),
+            )
 
-        logger.info(
-            "pipeline start session_id=%s status=%s messages=%d last_user_preview=%s",
-            session_id,
-            session.status,
-            len(session.messages),
-            _preview(last_user),
-        )
+        # Build LC messages for scope graph from stored chat (empty messages are skipped)
+        lc_messages = [
+            cls(content=m["content"])
+            for m in session.messages
+            if (cls := _ROLE_MAP.get(m.get("role"))) and m.get("content")
+        ]
+
+        # === Intent + Scope (concurrently) ===
+        # Both only read the stored chat, so the scope graph (clarification + brief) runs
+        # alongside intent detection; its result is dropped if the intent is non-research.
+        from fairy.research_agent_scope import scope_research  # noqa: E402
+
+        scope_out: dict[str, Any] = {}
+        scope_error: Optional[BaseException] = None
 
-        # Build LC messages for scope graph from stored chat
-        lc_messages = []
-        for m in session.messages:
-            role = m.get("role")
-            content = m.get("content", "")
-            if role == "user":
-                lc_messages.append(HumanMessage(content=content))
-            elif role == "assistant":
-                lc_messages.append(AIMessage(content=content))
-
-        # === Intent ===
-        _ensure_repo_root_on_syspath()
-        from fairy.init_model import init_model  # noqa: E402
-
-        t_intent = time.perf_counter()
-        intent_model = init_model(model="gpt-4.1-mini")
-        structured = intent_model.with_structured_output(IntentDecision)
+        async def _scope() -> None:
+            # Errors are held back so they only surface on the research path; on
+            # non-research the group is cancelled and the worker thread abandoned.
+            nonlocal scope_out, scope_error
+            try:
+                with Stage("scope", session_id) as stage:
+                    scope_out = await anyio.to_thread.run_sync(
+                        lambda: scope_research.invoke({"messages": lc_messages}),
+                        abandon_on_cancel=True,
+                    )
+                    stage.note(has_brief=bool(scope_out.get("research_brief")))
+            except Exception as exc:
+                scope_error = exc
+
+        structured = get_structured_intent_model()
         intent_prompt = (
             "你是一个 Web 研究 Agent 的意图识别器。\n"
             "给定用户最新需求，输出是否应进入 research 工作流，以及一个简短意图标签。\n"
@@ -106,24 +200,25 @@ class Orchestrator:
             "只输出结构化结果。\n\n"
             f"用户需求：{session.messages[-1]['content'] if session.messages else ''}"
         )
-        intent = await anyio.to_thread.run_sync(lambda: structured.invoke([HumanMessage(content=intent_prompt)]))
-        logger.info(
-            "intent done session_id=%s is_research=%s label=%s duration_ms=%.1f",
-            session_id,
-            intent.is_research,
-            intent.intent_label,
-            (time.perf_counter() - t_intent) * 1000.0,
-        )
-        session.intent = intent.model_dump()
-        session.updated_at = utc_now()
-        store.save_session(session)
-        await emit("intent_detected", {"intent": session.intent})
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(_scope)
+
+            with Stage("intent", session_id) as stage:
+                intent = await anyio.to_thread.run_sync(
+                    lambda: structured.invoke([HumanMessage(content=intent_prompt)])
+                )
+                stage.note(is_research=intent.is_research, label=intent.intent_label)
+            session.intent = intent.model_dump()
+            # Published as soon as intent is known, while scope may still be running.
+            await commit(("intent_detected", {"intent": session.intent}))
+            if not intent.is_research:
+                tg.cancel_scope.cancel()
 
         # Demo: if not research, still stop gracefully
         if not intent.is_research:
             session.status = "completed"
-            session.updated_at = utc_now()
-            store.save_session(session)
+            await commit()
             logger.info(
                 "pipeline stop (non-research) session_id=%s total_duration_ms=%.1f",
                 session_id,
@@ -131,19 +226,8 @@ class Orchestrator:
             )
             return
 
-        # === Scope (clarification + brief) ===
-        from fairy.research_agent_scope import scope_research  # noqa: E402
-
-        t_scope = time.perf_counter()
-        scope_out: dict[str, Any] = await anyio.to_thread.run_sync(
-            lambda: scope_research.invoke({"messages": lc_messages})
-        )
-        logger.info(
-            "scope done session_id=%s has_brief=%s duration_ms=%.1f",
-            session_id,
-            bool(scope_out.get("research_brief")),
-            (time.perf_counter() - t_scope) * 1000.0,
-        )
+        if scope_error is not None:
+            raise scope_error
 
         # If graph ended with a clarification question, it will be the last AI message.
         scope_messages = scope_out.get("messages") or []
@@ -155,45 +239,43 @@ class Orchestrator:
                 if not scope_out.get("research_brief"):
                     clarification_question = str(last.content)
                     # store assistant message in chat
-                    session.messages.append({"role": "assistant", "content": clarification_question})
+                    await add_message("assistant", clarification_question)
                 else:
                     # verification message
-                    session.messages.append({"role": "assistant", "content": str(last.content)})
+                    await add_message("assistant", str(last.content))
 
         if clarification_question:
             session.status = "needs_clarification"
             session.clarification_question = clarification_question
-            session.updated_at = utc_now()
-            store.save_session(session)
-            await emit("scope_clarification_needed", {"question": clarification_question})
-            logger.info(
-                "pipeline needs_clarification session_id=%s question_preview=%s total_duration_ms=%.1f",
-                session_id,
-                _preview(clarification_question),
-                (time.perf_counter() - overall_start) * 1000.0,
-            )
+            await commit(("scope_clarification_needed", {"question": clarification_question}))
+            if info_on:
+                logger.info(
+                    "pipeline needs_clarification session_id=%s question_preview=%s total_duration_ms=%.1f",
+                    session_id,
+                    _preview(clarification_question),
+                    (time.perf_counter() - overall_start) * 1000.0,
+                )
             return
 
         research_brief = scope_out.get("research_brief")
         if research_brief:
             session.research_brief = str(research_brief)
             session.clarification_question = None
-            session.updated_at = utc_now()
-            store.save_session(session)
-            await emit("research_brief_ready", {"research_brief": session.research_brief})
-            logger.info(
-                "research_brief ready session_id=%s brief_chars=%d preview=%s",
-                session_id,
-                len(session.research_brief or ""),
-                _preview(session.research_brief or ""),
-            )
+            await commit(("research_brief_ready", {"research_brief": session.research_brief}))
+            if info_on:
+                logger.info(
+                    "research_brief ready session_id=%s brief_chars=%d preview=%s",
+                    session_id,
+                    len(session.research_brief or ""),
+                    _preview(session.research_brief or ""),
+                )
         else:
             raise RuntimeError("scope did not produce research_brief")
 
         # === Research ===
         from fairy.research_agent import researcher_agent  # noqa: E402
 
-        t_research = time.perf_counter()
+        research = Stage("research", session_id)
         await emit("research_progress", {"stage": "start", "elapsed_s": 0.0})
 
         # Research can take a while; emit periodic heartbeat progress so UI doesn't look stuck.
@@ -216,37 +298,34 @@ class Orchestrator:
             done.set()
 
         async def _heartbeat() -> None:
-            # Avoid spamming; 2s is responsive enough for demo.
+            # First beat after 2s, then back off (x1.5, capped at 15s) for long runs. Waiting on
+            # `done` with a timeout (not sleeping) lets completion end the loop immediately.
+            delay = 2.0
             while not done.is_set():
-                await anyio.sleep(2.0)
+                with anyio.move_on_after(delay):
+                    await done.wait()
+                if done.is_set():
+                    break
                 await emit(
                     "research_progress",
                     {
                         "stage": "running",
-                        "elapsed_s": round(time.perf_counter() - t_research, 1),
+                        "elapsed_s": round(research.elapsed(), 1),
                     },
                 )
+                delay = min(delay * 1.5, 15.0)
 
-        async with anyio.create_task_group() as tg:
-            tg.start_soon(_do_research)
-            tg.start_soon(_heartbeat)
-            await done.wait()
-            tg.cancel_scope.cancel()
-        logger.info(
-            "research done session_id=%s duration_ms=%.1f out_keys=%s",
-            session_id,
-            (time.perf_counter() - t_research) * 1000.0,
-            list(researcher_out.keys()),
-        )
+        with research:
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(_do_research)
+                tg.start_soon(_heartbeat)
+            research.note(out_keys=list(researcher_out))
         session.compressed_research = str(researcher_out.get("compressed_research", ""))
         session.raw_notes = list(researcher_out.get("raw_notes") or [])
-        session.updated_at = utc_now()
-        store.save_session(session)
-        await emit(
-            "research_progress",
-            {"stage": "complete", "elapsed_s": round(time.perf_counter() - t_research, 1)},
+        await commit(
+            ("research_progress", {"stage": "complete", "elapsed_s": round(research.elapsed(), 1)}),
+            ("research_complete", {"compressed_research": session.compressed_research}),
         )
-        await emit("research_complete", {"compressed_research": session.compressed_research})
         logger.info(
             "research artifacts session_id=%s compressed_chars=%d raw_notes=%d",
             session_id,
@@ -258,26 +337,21 @@ class Orchestrator:
         from fairy.prompts import final_report_generation_prompt  # noqa: E402
         from fairy.utils import get_today_str as fairy_today  # noqa: E402
 
-        t_report = time.perf_counter()
-        report_model = init_model(model="gpt-4.1")
-        prompt = final_report_generation_prompt.format(
-            research_brief=session.research_brief or "",
-            findings=session.compressed_research or "",
-            date=fairy_today(),
-        )
-        report_msg = await anyio.to_thread.run_sync(lambda: report_model.invoke([HumanMessage(content=prompt)]))
-        session.final_report = str(report_msg.content)
-        session.status = "completed"
-        session.updated_at = utc_now()
-        store.save_session(session)
-        await emit("final_report_ready", {"final_report": session.final_report})
-        logger.info(
-            "final_report ready session_id=%s duration_ms=%.1f report_chars=%d total_duration_ms=%.1f",
-            session_id,
-            (time.perf_counter() - t_report) * 1000.0,
-            len(session.final_report or ""),
-            (time.perf_counter() - overall_start) * 1000.0,
-        )
+        with Stage("final_report", session_id) as stage:
+            report_model = get_chat_model("gpt-4.1")
+            prompt = final_report_generation_prompt.format(
+                research_brief=session.research_brief or "",
+                findings=session.compressed_research or "",
+                date=fairy_today(),
+            )
+            report_msg = await anyio.to_thread.run_sync(lambda: report_model.invoke([HumanMessage(content=prompt)]))
+            session.final_report = str(report_msg.content)
+            session.status = "completed"
+            await commit(("final_report_ready", {"final_report": session.final_report}))
+            stage.note(
+                report_chars=len(session.final_report),
+                total_duration_ms=round((time.perf_counter() - overall_start) * 1000.0, 1),
+            )
 
     async def safe_run(self, session_id: str) -> None:
         store = get_store()
@@ -286,17 +360,15 @@ class Orchestrator:
         except Exception as e:  # pragma: no cover (demo safety)
             logger.exception("pipeline error session_id=%s error=%s", session_id, e)
             try:
-                session = store.get_session(session_id)
+                session = await anyio.to_thread.run_sync(store.get_session, session_id)
                 session.status = "error"
                 session.last_error = str(e)
                 session.updated_at = utc_now()
-                store.save_session(session)
-                ev = store.append_event(session_id, type="error", payload={"error": str(e)})
-                pubsub = get_pubsub()
-                await pubsub.publish(
-                    session_id,
-                    {"id": ev.id, "type": ev.type, "data": {"ts": ev.ts.isoformat(), "payload": ev.payload}},
+                evs = await anyio.to_thread.run_sync(
+                    store.save_session_with_events, session, [("error", {"error": str(e)})]
                 )
+                pubsub = get_pubsub()
+                pubsub.publish(session_id, evs[0].sse, critical=True)
             except Exception:
                 # best-effort only
                 pass
@@ -4,28 +4,82 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from dataclasses import dataclass
-from typing import Any, AsyncIterator, Dict
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Sequence
 
 
 logger = logging.getLogger(__name__)
 
 
+# Max non-critical frames buffered per subscriber; beyond that the oldest are evicted (slow consumer).
+SUBSCRIBER_BUFFER_SIZE = 200
+
+# Events that end a run. They are never evicted, so a slow client still learns the outcome.
+CRITICAL_EVENT_TYPES = frozenset({"scope_clarification_needed", "final_report_ready", "error"})
+
+
 @dataclass(eq=False)
 class Subscriber:
-    queue: "asyncio.Queue[dict[str, Any]]"
+    """Per-connection buffer: one publish-ordered deque plus one Event to wake the reader.
+
+    Cheaper than `asyncio.Queue` (no getter futures per item); the reader drains
+    everything buffered in one go and writes it as a single batch.
+
+    Once more than `SUBSCRIBER_BUFFER_SIZE` non-critical frames are buffered, the
+    oldest non-critical one is dropped, so a slow reader keeps the latest progress.
+    Critical frames are never dropped and keep their place in publish order.
+    """
+
+    buf: deque[tuple[bytes, bool]] = field(default_factory=deque)
+    droppable: int = 0
+    evt: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def push(self, frame: bytes, *, critical: bool = False) -> bool:
+        """Buffer a frame; returns False if an older frame was evicted to make room."""
+        self.buf.append((frame, critical))
+        self.evt.set()
+        if critical:
+            return True
+        self.droppable += 1
+        if self.droppable <= SUBSCRIBER_BUFFER_SIZE:
+            return True
+        # Critical frames are terminal, so the head is almost always droppable.
+        for i, (_, is_critical) in enumerate(self.buf):
+            if not is_critical:
+                del self.buf[i]
+                break
+        self.droppable -= 1
+        return False
+
+    def pending(self) -> bool:
+        return bool(self.buf)
+
+    def drain(self) -> list[bytes]:
+        frames = [frame for frame, _ in self.buf]
+        self.buf.clear()
+        self.droppable = 0
+        self.evt.clear()
+        return frames
 
 
 class SessionPubSub:
+    """Per-session fan-out of SSE frames.
+
+    Subscriber sets are immutable tuples replaced on (un)subscribe (copy-on-write), so
+    publishing is a plain dict lookup + tuple iteration: no lock, no await.
+    """
+
     def __init__(self) -> None:
-        self._subs: Dict[str, set[Subscriber]] = {}
+        self._subs: Dict[str, tuple[Subscriber, ...]] = {}
         self._lock = asyncio.Lock()
 
     async def subscribe(self, session_id: str) -> Subscriber:
-        sub = Subscriber(queue=asyncio.Queue(maxsize=200))
+        sub = Subscriber()
         async with self._lock:
-            self._subs.setdefault(session_id, set()).add(sub)
-            logger.debug("pubsub subscribe session_id=%s subs=%d", session_id, len(self._subs.get(session_id, set())))
+            subs = self._subs.get(session_id, ()) + (sub,)
+            self._subs[session_id] = subs
+            logger.debug("pubsub subscribe session_id=%s subs=%d", session_id, len(subs))
         return sub
 
     async def unsubscribe(self, session_id: str, sub: Subscriber) -> None:
@@ -33,27 +87,42 @@ class SessionPubSub:
             subs = self._subs.get(session_id)
             if not subs:
                 return
-            subs.discard(sub)
-            if not subs:
+            remaining = tuple(s for s in subs if s is not sub)
+            if remaining:
+                self._subs[session_id] = remaining
+            else:
                 self._subs.pop(session_id, None)
-            logger.debug("pubsub unsubscribe session_id=%s remaining=%d", session_id, len(self._subs.get(session_id, set())))
+            logger.debug("pubsub unsubscribe session_id=%s remaining=%d", session_id, len(remaining))
 
-    async def publish(self, session_id: str, message: dict[str, Any]) -> None:
-        async with self._lock:
-            subs = list(self._subs.get(session_id, set()))
+    def publish(self, session_id: str, frame: bytes, *, critical: bool = False) -> None:
+        """Fan out a pre-encoded SSE frame; every subscriber shares the same buffer."""
+        subs = self._subs.get(session_id, ())
         if subs:
-            logger.debug("pubsub publish session_id=%s fanout=%d type=%s", session_id, len(subs), message.get("type"))
+            logger.debug("pubsub publish session_id=%s fanout=%d bytes=%d", session_id, len(subs), len(frame))
         for sub in subs:
-            try:
-                sub.queue.put_nowait(message)
-            except asyncio.QueueFull:
-                # Drop if slow consumer (demo)
-                logger.warning("pubsub drop (queue full) session_id=%s", session_id)
-                pass
-
-    async def stream(self, session_id: str, sub: Subscriber) -> AsyncIterator[dict[str, Any]]:
+            if not sub.push(frame, critical=critical):
+                # Slow consumer: the oldest buffered frame was dropped (demo)
+                logger.warning("pubsub drop oldest (buffer full) session_id=%s", session_id)
+
+    def publish_many(self, session_id: str, frames: Sequence[tuple[bytes, bool]]) -> None:
+        """Fan out several `(frame, critical)` pairs in one pass (one wakeup per subscriber)."""
+        if not frames:
+            return
+        subs = self._subs.get(session_id, ())
+        if subs:
+            logger.debug("pubsub publish_many session_id=%s fanout=%d frames=%d", session_id, len(subs), len(frames))
+        for sub in subs:
+            dropped = 0
+            for frame, critical in frames:
+                if not sub.push(frame, critical=critical):
+                    dropped += 1
+            if dropped:
+                logger.warning("pubsub drop oldest (buffer full) session_id=%s dropped=%d", session_id, dropped)
+
+    async def stream(self, session_id: str, sub: Subscriber) -> AsyncIterator[bytes]:
         while True:
-            msg = await sub.queue.get()
-            yield msg
+            await sub.evt.wait()
+            for frame in sub.drain():
+                yield frame
 
 
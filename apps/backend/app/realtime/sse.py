@@ -0,0 +1,55 @@
+"""Server-Sent Events framing helpers."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover (orjson is a declared dependency)
+    orjson = None  # type: ignore[assignment]
+
+
+KEEPALIVE_FRAME = b": keep-alive\n\n"
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_bytes(data: Any) -> bytes:
+    # orjson always emits UTF-8 and serializes datetimes natively.
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def sse_frame(event: str, data: dict, *, event_id: Optional[int] = None) -> bytes:
+    # Built directly in bytes: no intermediate str and no encode pass at the yield site.
+    parts = []
+    if event_id is not None:
+        parts.append(b"id: %d\n" % event_id)
+    parts.append(b"event: ")
+    parts.append(event.encode("utf-8"))
+    parts.append(b"\ndata: ")
+    parts.append(json_bytes(data))
+    parts.append(b"\n\n")
+    return b"".join(parts)
+
+
+def sse_event_frame(event_id: int, event: str, ts_iso: str, payload_json: bytes) -> bytes:
+    """Build a pipeline event frame from an already-encoded JSON payload.
+
+    Equivalent to `sse_frame(event, {"ts": ..., "payload": ...}, event_id=...)` but splices
+    the stored JSON text in verbatim, so no decode/encode round trip is needed.
+    """
+    return b'id: %d\nevent: %s\ndata: {"ts":"%s","payload":%s}\n\n' % (
+        event_id,
+        event.encode("utf-8"),
+        ts_iso.encode("ascii"),
+        payload_json,
+    )
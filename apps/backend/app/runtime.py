@@ -2,17 +2,36 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import importlib
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
+
+import anyio.to_thread
 
 from app.realtime.pubsub import SessionPubSub
 from app.storage.sqlite import SQLiteStore
 
 
+logger = logging.getLogger(__name__)
+
+
 _store: Optional[SQLiteStore] = None
 _pubsub: Optional[SessionPubSub] = None
 
+# Modules the pipeline imports on its first run (graph compilation + model clients).
+_PRELOAD_MODULES = (
+    "fairy.init_model",
+    "fairy.research_agent_scope",
+    "fairy.research_agent",
+    "fairy.prompts",
+    "fairy.utils",
+)
+
 
 def get_store() -> SQLiteStore:
     global _store
@@ -34,3 +53,41 @@ def get_pubsub() -> SessionPubSub:
     return _pubsub
 
 
+@functools.lru_cache(maxsize=8)
+def get_chat_model(name: str) -> Any:
+    """Return a shared chat model client for `name` (built once per process)."""
+    from fairy.init_model import init_model
+
+    return init_model(model=name)
+
+
+def configure_thread_pool() -> int:
+    """Size the worker threads that run blocking model/graph/SQLite calls.
+
+    `anyio.to_thread.run_sync` (every LLM call in the orchestrator) is capped by anyio's
+    default limiter (40 threads), so a few concurrent sessions queue behind each other.
+    Raise it, and the event loop's default executor, to `FAIRY_DEMO_THREAD_POOL_SIZE`.
+    Must run inside the event loop (called from the app lifespan).
+    """
+    size = int(os.getenv("FAIRY_DEMO_THREAD_POOL_SIZE", "64"))
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=size, thread_name_prefix="fairy-worker")
+    )
+    return size
+
+
+def preload() -> None:
+    """Import the research pipeline ahead of the first request.
+
+    Best-effort: a failing import (e.g. missing model credentials) is logged and will
+    surface again as a pipeline error when a session actually runs.
+    """
+    # Importing the orchestrator puts the repo's `src/` on sys.path for `fairy`.
+    import app.pipeline.orchestrator  # noqa: F401
+
+    for name in _PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            logger.exception("preload failed module=%s", name)
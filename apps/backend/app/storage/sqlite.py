@@ -4,13 +4,16 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
+import zlib
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any, Iterator, Optional
+from typing import Any, Iterator, Optional, Sequence
 
 from app.models import EventEnvelope, EventRecord, SessionState
+from app.realtime.sse import json_bytes, sse_event_frame
 
 
 def utc_now() -> datetime:
@@ -22,17 +25,90 @@ def _dt_to_str(dt: datetime) -> str:
     return dt.isoformat()
 
 
-def _str_to_dt(s: str) -> datetime:
-    # Python 3.11: fromisoformat handles offset
-    return datetime.fromisoformat(s)
+def _state_to_json(state: SessionState) -> str:
+    # orjson over the plain-dict dump is ~3x faster than model_dump_json() on large sessions.
+    # Messages live in `session_messages` (append-only), so saves don't rewrite the chat.
+    return json_bytes(state.model_dump(mode="json", exclude={"messages"})).decode("utf-8")
+
+
+def _session_update_params(session: SessionState) -> tuple[str, str, str, str]:
+    return (_dt_to_str(session.updated_at), session.status, _state_to_json(session), session.session_id)
+
+
+# Statement text is kept constant so the connection's statement cache reuses the prepared
+# statements instead of re-parsing SQL on every call.
+SQL_INSERT_SESSION = "INSERT INTO sessions (id, created_at, updated_at, status, state_json) VALUES (?, ?, ?, ?, ?)"
+SQL_SELECT_SESSION = "SELECT state_json FROM sessions WHERE id = ?"
+SQL_UPDATE_SESSION = "UPDATE sessions SET updated_at = ?, status = ?, state_json = ? WHERE id = ?"
+SQL_INSERT_MESSAGE = (
+    "INSERT INTO session_messages (session_id, seq, role, content)"
+    " SELECT ?1, COALESCE(MAX(seq) + 1, 0), ?2, ?3 FROM session_messages WHERE session_id = ?1"
+)
+SQL_SELECT_MESSAGES = "SELECT role, content FROM session_messages WHERE session_id = ? ORDER BY seq"
+SQL_INSERT_EVENT = (
+    "INSERT INTO events (session_id, ts, type, payload_json, payload_blob, payload_enc) VALUES (?, ?, ?, ?, ?, ?)"
+)
+SQL_SELECT_EVENTS = (
+    "SELECT id, ts, type, payload_json, payload_blob, payload_enc FROM events"
+    " WHERE session_id = ? AND id > ? ORDER BY id ASC LIMIT ?"
+)
+
+# Payloads larger than this (encoded JSON bytes) are stored zlib-compressed in `payload_blob`.
+PAYLOAD_COMPRESS_THRESHOLD = 2048
+_ENC_JSON = "json"
+_ENC_ZLIB_JSON = "zlib+json"
+
+
+def _encode_payload(raw: bytes) -> tuple[str, Optional[bytes], str]:
+    """Return the `(payload_json, payload_blob, payload_enc)` column values for an encoded payload."""
+    if len(raw) > PAYLOAD_COMPRESS_THRESHOLD:
+        return "", zlib.compress(raw), _ENC_ZLIB_JSON
+    return raw.decode("utf-8"), None, _ENC_JSON
+
+
+def _decode_payload(payload_json: Optional[str], blob: Optional[bytes], enc: Optional[str]) -> bytes:
+    """Inverse of `_encode_payload`: the payload's JSON bytes."""
+    if enc == _ENC_ZLIB_JSON:
+        return zlib.decompress(blob)
+    return (payload_json or "{}").encode("utf-8")
+
+# sqlite3's per-connection statement cache (default 128).
+_STATEMENT_CACHE_SIZE = 256
+
+# Applied once when the shared connection is opened.
+_PRAGMAS = (
+    # WAL: readers don't block the writer; commits append to the log instead of rewriting pages.
+    "PRAGMA journal_mode=WAL",
+    # Safe with WAL (no corruption on crash; may lose the last commits on power loss).
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=67108864",
+)
 
 
 @dataclass(frozen=True)
 class SQLiteStore:
+    """Session/event store backed by one long-lived SQLite connection.
+
+    The connection is opened in `init()` in autocommit mode and shared by the event
+    loop and threadpool callers; `_lock` serializes access to it.
+    """
+
     db_path: Path
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _db: sqlite3.Connection = field(init=False, repr=False, compare=False)
 
     def init(self) -> None:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+        )
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        object.__setattr__(self, "_db", conn)
         with self._conn() as conn:
             conn.execute(
                 """
@@ -45,6 +121,22 @@ class SQLiteStore:
                 );
                 """
             )
+            has_messages_table = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'session_messages'"
+            ).fetchone()
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_messages (
+                  session_id TEXT NOT NULL,
+                  seq INTEGER NOT NULL,
+                  role TEXT NOT NULL,
+                  content TEXT NOT NULL,
+                  PRIMARY KEY(session_id, seq)
+                ) WITHOUT ROWID;
+                """
+            )
+            if not has_messages_table:
+                self._migrate_inline_messages(conn)
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS events (
@@ -57,18 +149,49 @@ class SQLiteStore:
                 );
                 """
             )
+            # Columns added after the initial schema; migrate existing databases in place.
+            cols = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+            if "payload_blob" not in cols:
+                conn.execute("ALTER TABLE events ADD COLUMN payload_blob BLOB")
+            if "payload_enc" not in cols:
+                conn.execute(f"ALTER TABLE events ADD COLUMN payload_enc TEXT NOT NULL DEFAULT '{_ENC_JSON}'")
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_events_session_id_id ON events(session_id, id);"
             )
-            conn.commit()
+
+    @staticmethod
+    def _migrate_inline_messages(conn: sqlite3.Connection) -> None:
+        """Move messages embedded in older `state_json` rows into `session_messages`."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for session_id, state_json in conn.execute("SELECT id, state_json FROM sessions").fetchall():
+                state = json.loads(state_json)
+                messages = state.pop("messages", None) or []
+                conn.executemany(
+                    "INSERT INTO session_messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                    [
+                        (session_id, seq, str(m.get("role", "")), str(m.get("content", "")))
+                        for seq, m in enumerate(messages)
+                    ],
+                )
+                conn.execute(
+                    "UPDATE sessions SET state_json = ? WHERE id = ?",
+                    (json_bytes(state).decode("utf-8"), session_id),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
 
     @contextmanager
     def _conn(self) -> Iterator[sqlite3.Connection]:
-        conn = sqlite3.connect(self.db_path)
-        try:
-            yield conn
-        finally:
-            conn.close()
+        # Never hold this across an `await`/`yield`: the lock is not reentrant.
+        with self._lock:
+            yield self._db
 
     def create_session(self, session_id: str) -> SessionState:
         now = utc_now()
@@ -81,40 +204,36 @@ class SQLiteStore:
         )
         with self._conn() as conn:
             conn.execute(
-                "INSERT INTO sessions (id, created_at, updated_at, status, state_json) VALUES (?, ?, ?, ?, ?)",
+                SQL_INSERT_SESSION,
                 (
                     session_id,
                     _dt_to_str(state.created_at),
                     _dt_to_str(state.updated_at),
                     state.status,
-                    state.model_dump_json(),
+                    _state_to_json(state),
                 ),
             )
-            conn.commit()
         return state
 
     def get_session(self, session_id: str) -> SessionState:
         with self._conn() as conn:
-            row = conn.execute(
-                "SELECT state_json FROM sessions WHERE id = ?",
-                (session_id,),
-            ).fetchone()
+            row = conn.execute(SQL_SELECT_SESSION, (session_id,)).fetchone()
+            if row:
+                messages = conn.execute(SQL_SELECT_MESSAGES, (session_id,)).fetchall()
         if not row:
             raise KeyError(f"session not found: {session_id}")
-        return SessionState.model_validate_json(row[0])
+        session = SessionState.model_validate_json(row[0])
+        session.messages = [{"role": role, "content": content} for role, content in messages]
+        return session
+
+    def append_message(self, session_id: str, role: str, content: str) -> None:
+        """Append one chat message (single-row INSERT; `save_session` does not persist messages)."""
+        with self._conn() as conn:
+            conn.execute(SQL_INSERT_MESSAGE, (session_id, role, content))
 
     def save_session(self, session: SessionState) -> None:
         with self._conn() as conn:
-            conn.execute(
-                "UPDATE sessions SET updated_at = ?, status = ?, state_json = ? WHERE id = ?",
-                (
-                    _dt_to_str(session.updated_at),
-                    session.status,
-                    session.model_dump_json(),
-                    session.session_id,
-                ),
-            )
-            conn.commit()
+            conn.execute(SQL_UPDATE_SESSION, _session_update_params(session))
 
     def append_event(
         self,
@@ -126,15 +245,85 @@ class SQLiteStore:
     ) -> EventEnvelope:
         payload = payload or {}
         ts = ts or utc_now()
+        ts_s = _dt_to_str(ts)
+        payload_bytes = json_bytes(payload)
         with self._conn() as conn:
-            cur = conn.execute(
-                "INSERT INTO events (session_id, ts, type, payload_json) VALUES (?, ?, ?, ?)",
-                (session_id, _dt_to_str(ts), type, json.dumps(payload, ensure_ascii=False)),
-            )
+            cur = conn.execute(SQL_INSERT_EVENT, (session_id, ts_s, type, *_encode_payload(payload_bytes)))
             event_id = int(cur.lastrowid)
-            conn.commit()
 
-        return EventEnvelope(id=event_id, type=type, ts=ts, payload=payload)
+        return EventEnvelope(
+            id=event_id,
+            type=type,
+            ts=ts,
+            payload=payload,
+            sse=sse_event_frame(event_id, type, ts_s, payload_bytes),
+        )
+
+    def append_events(
+        self,
+        session_id: str,
+        items: Sequence[tuple[str, dict[str, Any]]],
+        *,
+        ts: Optional[datetime] = None,
+    ) -> list[EventEnvelope]:
+        """Insert several `(type, payload)` events in one transaction (one commit)."""
+        if not items:
+            return []
+        return self._write(session_id, None, items, ts)
+
+    def save_session_with_events(
+        self,
+        session: SessionState,
+        items: Sequence[tuple[str, dict[str, Any]]] = (),
+        *,
+        ts: Optional[datetime] = None,
+    ) -> list[EventEnvelope]:
+        """Save `session` and insert `(type, payload)` events in one transaction (one commit).
+
+        Pipeline stages always persist their state and then announce it; doing both in
+        one commit halves the writes per stage.
+        """
+        return self._write(session.session_id, session, items, ts)
+
+    def _write(
+        self,
+        session_id: str,
+        session: Optional[SessionState],
+        items: Sequence[tuple[str, dict[str, Any]]],
+        ts: Optional[datetime],
+    ) -> list[EventEnvelope]:
+        ts = ts or utc_now()
+        ts_s = _dt_to_str(ts)
+        session_params = _session_update_params(session) if session is not None else None
+        encoded = [json_bytes(payload or {}) for _, payload in items]
+        rows = [(session_id, ts_s, typ, *_encode_payload(raw)) for (typ, _), raw in zip(items, encoded)]
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if session_params is not None:
+                    conn.execute(SQL_UPDATE_SESSION, session_params)
+                if rows:
+                    conn.executemany(SQL_INSERT_EVENT, rows)
+                    # executemany() doesn't set lastrowid; ids are contiguous while we hold the write lock.
+                    last_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        if not rows:
+            return []
+        first_id = last_id - len(rows) + 1
+        return [
+            EventEnvelope(
+                id=first_id + i,
+                type=typ,
+                ts=ts,
+                payload=payload or {},
+                sse=sse_event_frame(first_id + i, typ, ts_s, raw),
+            )
+            for i, ((typ, payload), raw) in enumerate(zip(items, encoded))
+        ]
 
     def list_events(
         self,
@@ -143,29 +332,59 @@ class SQLiteStore:
         after_id: int = 0,
         limit: int = 200,
     ) -> list[EventRecord]:
-        with self._conn() as conn:
-            rows = conn.execute(
-                """
-                SELECT id, session_id, ts, type, payload_json
-                FROM events
-                WHERE session_id = ? AND id > ?
-                ORDER BY id ASC
-                LIMIT ?
-                """,
-                (session_id, after_id, limit),
-            ).fetchall()
-
-        out: list[EventRecord] = []
-        for (eid, sid, ts_s, typ, payload_json) in rows:
-            out.append(
-                EventRecord(
-                    id=int(eid),
-                    session_id=str(sid),
-                    ts=_str_to_dt(str(ts_s)),
-                    type=typ,
-                    payload=json.loads(payload_json) if payload_json else {},
-                )
+        return list(self.iter_events(session_id, after_id=after_id, limit=limit))
+
+    def iter_events(
+        self,
+        session_id: str,
+        *,
+        after_id: int = 0,
+        limit: int = 200,
+        batch_size: int = 50,
+    ) -> Iterator[EventRecord]:
+        """Yield `EventRecord`s for events after `after_id`, fetching rows lazily."""
+        # `ts` is handed to pydantic as the stored ISO string; its (Rust) datetime parser is
+        # cheaper than a Python-level fromisoformat() round trip per row.
+        for (eid, ts_s, typ, payload_json, blob, enc) in self._iter_event_rows(session_id, after_id, limit, batch_size):
+            event_id = int(eid)
+            raw = _decode_payload(payload_json, blob, enc)
+            yield EventRecord(
+                id=event_id,
+                session_id=session_id,
+                ts=ts_s,
+                type=typ,
+                payload=json.loads(raw),
+                sse=sse_event_frame(event_id, typ, ts_s, raw),
             )
-        return out
 
+    def iter_event_frames(
+        self,
+        session_id: str,
+        *,
+        after_id: int = 0,
+        limit: int = 500,
+        batch_size: int = 50,
+    ) -> Iterator[bytes]:
+        """Yield SSE frames for events after `after_id`, fetching rows lazily.
+
+        Used by SSE replay: rows are pulled `batch_size` at a time so the first frame can
+        be sent before the rest are read. The stored JSON is spliced into the frame as-is
+        (large payloads are only decompressed), so replay does no JSON parsing/encoding
+        and builds no `EventRecord`s.
+        """
+        for (eid, ts_s, typ, payload_json, blob, enc) in self._iter_event_rows(session_id, after_id, limit, batch_size):
+            # ts is stored as ISO 8601 text already; no need to round-trip through datetime.
+            yield sse_event_frame(int(eid), typ, ts_s, _decode_payload(payload_json, blob, enc))
 
+    def _iter_event_rows(self, session_id: str, after_id: int, limit: int, batch_size: int) -> Iterator[tuple]:
+        # Each batch is a separate keyset query, so the shared connection is never held
+        # while the caller is suspended between rows.
+        remaining = limit
+        while remaining > 0:
+            with self._conn() as conn:
+                rows = conn.execute(SQL_SELECT_EVENTS, (session_id, after_id, min(batch_size, remaining))).fetchall()
+            if not rows:
+                return
+            remaining -= len(rows)
+            after_id = int(rows[-1][0])
+            yield from rows
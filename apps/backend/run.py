@@ -0,0 +1,34 @@
+"""Launcher for the demo backend with the fast uvicorn stack.
+
+- loop=uvloop: libuv-based event loop instead of the pure-Python selector loop
+- http=httptools (via `app.server.NoDelayHttpProtocol`): C HTTP parser, TCP_NODELAY on
+
+Both come with `uvicorn[standard]`.
+
+Usage:
+    uv run python run.py
+
+Note: SSE fan-out uses an in-process pubsub, so keep FAIRY_DEMO_WORKERS=1 unless
+every client's POST and SSE stream are pinned to the same worker.
+"""
+
+from __future__ import annotations
+
+import os
+
+import uvicorn
+
+
+def main() -> None:
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("FAIRY_DEMO_HOST", "127.0.0.1"),
+        port=int(os.getenv("FAIRY_DEMO_PORT", "8000")),
+        loop="uvloop",
+        http="app.server:NoDelayHttpProtocol",
+        workers=int(os.getenv("FAIRY_DEMO_WORKERS", "1")),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""图执行检查点
+
+可选功能：设置 FAIRY_CHECKPOINT_PATH 后，编排图（supervisor / full / MCP）在每个节点
+完成后把状态写入 SQLite 检查点。失败后用同一 thread_id 重试时，LangGraph 从最后一个
+成功的节点继续，不会重跑之前的 LLM 调用（例如聚合失败时不再重跑并行研究）。
+
+未设置时不启用检查点，图的调用方式与之前完全相同。
+"""
+
+import hashlib
+import os
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import load_dotenv
+load_dotenv()
+
+CHECKPOINT_PATH = os.getenv("FAIRY_CHECKPOINT_PATH")
+
+
+@lru_cache(maxsize=1)
+def get_checkpointer():
+    """返回进程内共享的 SqliteSaver；未配置 FAIRY_CHECKPOINT_PATH 时返回 None。
+
+    SqliteSaver 只实现同步接口，启用后请使用 invoke / stream 调用图。
+    """
+    if not CHECKPOINT_PATH:
+        return None
+
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    Path(CHECKPOINT_PATH).parent.mkdir(parents=True, exist_ok=True)
+    return SqliteSaver(sqlite3.connect(CHECKPOINT_PATH, check_same_thread=False))
+
+
+def thread_config(key: str) -> dict:
+    """根据研究问题生成稳定的 thread_id 配置，同一问题的重试命中同一组检查点。
+
+    首次运行：graph.invoke(inputs, thread_config(question))
+    失败后续跑：graph.invoke(None, thread_config(question))
+    """
+    thread_id = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return {"configurable": {"thread_id": thread_id}}
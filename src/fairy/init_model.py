@@ -2,12 +2,26 @@ from langchain.chat_models import init_chat_model
 
 # Initialize model
 import os
+from functools import lru_cache
+from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
 
 MODEL_BASE_URL = os.getenv("MODEL_BASE_URL")
 MODEL_API_KEY = os.getenv("MODEL_API_KEY")
 
+# 可选：LLM 响应精确缓存。设置后，相同模型参数 + 相同 prompt 的调用直接返回缓存结果，
+# 不再请求模型（例如重复运行同一研究简报、跨会话重复摘要同一网页）。
+LLM_CACHE_PATH = os.getenv("FAIRY_LLM_CACHE_PATH")
+if LLM_CACHE_PATH:
+    from langchain_community.cache import SQLiteCache
+    from langchain_core.globals import set_llm_cache
+
+    Path(LLM_CACHE_PATH).parent.mkdir(parents=True, exist_ok=True)
+    set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
+# 相同参数的模型只创建一次，各模块共享同一个客户端（及其连接池）
+@lru_cache(maxsize=16)
 def init_model(model: str, temperature=0.0, max_tokens=32000):
     return init_chat_model(
         model=model,
@@ -8,22 +8,32 @@
 4. 生成最终的研究报告
 """
 
-from typing import Literal, List
-from datetime import datetime
-
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, get_buffer_string
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Literal, List, Optional
+from typing_extensions import Annotated, TypedDict
+
+from langchain_core.messages import AnyMessage, SystemMessage, HumanMessage, AIMessage, get_buffer_string
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 
+from fairy.checkpoint import get_checkpointer
 from fairy.init_model import init_model
 from fairy.prompts import lead_researcher_prompt
 from fairy.research_agent import researcher_agent
 from fairy.state_research import ResearcherState, ResearcherOutputState
+from fairy.utils import get_today_str
 
 # ===== 配置 =====
 
-# 初始化模型
-model = init_model(model="gpt-4.1")
+# 模型在首次调用时初始化（init_model 按参数缓存，各模块共享同一个客户端）
+def get_model():
+    return init_model(model="gpt-4.1")
 
 # ===== Pydantic 模型 =====
 
@@ -55,11 +65,11 @@ def analyze_task(research_question: str, max_concurrent: int = 3) -> TaskAnalysi
     from fairy.prompts import lead_researcher_prompt
 
     # 使用结构化输出
-    structured_model = model.with_structured_output(TaskAnalysis)
+    structured_model = get_model().with_structured_output(TaskAnalysis)
 
     # 构建提示
     prompt = lead_researcher_prompt.format(
-        date=datetime.now().strftime("%a %b %-d, %Y"),
+        date=get_today_str(),
         max_concurrent_research_units=max_concurrent,
         max_researcher_iterations=5
     )
@@ -74,17 +84,8 @@ def analyze_task(research_question: str, max_concurrent: int = 3) -> TaskAnalysi
     return response
 
 
-def aggregate_results(research_question: str, agent_results: List[dict]) -> str:
-    """
-    聚合所有 Agent 的研究结果
-
-    Args:
-        research_question: 原始研究问题
-        agent_results: 各个 Agent 的研究结果
-
-    Returns:
-        str: 最终报告
-    """
+def _report_messages(research_question: str, agent_results: List[dict]) -> list:
+    """构建最终报告生成的消息"""
     from fairy.prompts import final_report_generation_prompt
 
     # 构建研究结果文本
@@ -97,16 +98,174 @@ def aggregate_results(research_question: str, agent_results: List[dict]) -> str:
     prompt = final_report_generation_prompt.format(
         research_brief=research_question,
         findings=findings_text,
-        date=datetime.now().strftime("%a %b %-d, %Y")
+        date=get_today_str()
     )
 
-    messages = [
+    return [
         HumanMessage(content=prompt)
     ]
 
-    # 调用模型生成报告
-    response = model.invoke(messages)
-    return response.content
+
+def aggregate_results(
+    research_question: str,
+    agent_results: List[dict],
+    on_chunk: Optional[Callable[[str], None]] = None
+) -> str:
+    """
+    聚合所有 Agent 的研究结果
+
+    报告以流式方式生成，每收到一段文本就回调 `on_chunk`，
+    调用方无需等待整篇报告生成完毕即可展示。
+
+    Args:
+        research_question: 原始研究问题
+        agent_results: 各个 Agent 的研究结果
+        on_chunk: 可选，接收增量文本的回调
+
+    Returns:
+        str: 最终报告
+    """
+    parts = []
+    for chunk in get_model().stream(_report_messages(research_question, agent_results)):
+        if chunk.text:
+            parts.append(chunk.text)
+            if on_chunk:
+                on_chunk(chunk.text)
+    return "".join(parts)
+
+
+async def aaggregate_results(
+    research_question: str,
+    agent_results: List[dict],
+    on_chunk: Optional[Callable[[str], None]] = None
+) -> str:
+    """`aggregate_results` 的异步版本（astream）"""
+    parts = []
+    async for chunk in get_model().astream(_report_messages(research_question, agent_results)):
+        if chunk.text:
+            parts.append(chunk.text)
+            if on_chunk:
+                on_chunk(chunk.text)
+    return "".join(parts)
+
+
+def report_chunk_writer() -> Callable[[str], None]:
+    """
+    在图节点内把报告增量写入 LangGraph 的 custom 流
+
+    以 stream_mode="custom" 调用图时，会收到 {"final_report_delta": 文本} 事件；
+    其他模式下写入会被忽略。
+    """
+    writer = get_stream_writer()
+    return lambda text: writer({"final_report_delta": text})
+
+
+def _subtask_state(task: str) -> ResearcherState:
+    """构建单个子任务的 research agent 输入状态"""
+    return {
+        "researcher_messages": [HumanMessage(content=task)],
+        "tool_call_iterations": 0,
+        "research_topic": task,
+        "compressed_research": "",
+        "raw_notes": []
+    }
+
+
+def _collect_results(subtasks: List[dict], results: List[dict]) -> List[dict]:
+    """按子任务顺序整理 research agent 的输出"""
+    return [
+        {
+            "task": subtask["task"],
+            "compressed_research": result["compressed_research"],
+            "raw_notes": result.get("raw_notes", [])
+        }
+        for subtask, result in zip(subtasks, results)
+    ]
+
+
+# ===== 子任务去重与结果缓存 =====
+
+# 进程内按任务文本缓存 research agent 的结果，重复的子任务不再重新搜索和摘要
+RESEARCH_CACHE_SIZE = 1024
+_research_cache: "OrderedDict[str, dict]" = OrderedDict()
+_research_cache_lock = threading.Lock()
+
+
+def _task_key(task: str) -> str:
+    """子任务的缓存键：忽略大小写和空白差异后的 sha256"""
+    normalized = " ".join(task.split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _plan_subtasks(subtasks: List[dict]) -> tuple[List[str], dict, dict]:
+    """
+    计算每个子任务的键，区分已缓存的结果和需要执行的唯一任务
+
+    Returns:
+        (keys, known, pending)：子任务键列表、已缓存的结果、待执行的 {键: 任务文本}
+    """
+    keys = [_task_key(subtask["task"]) for subtask in subtasks]
+    known, pending = {}, {}
+    with _research_cache_lock:
+        for key, subtask in zip(keys, subtasks):
+            if key in known or key in pending:
+                continue
+            if key in _research_cache:
+                _research_cache.move_to_end(key)
+                known[key] = _research_cache[key]
+            else:
+                pending[key] = subtask["task"]
+    return keys, known, pending
+
+
+def _finish_subtasks(subtasks: List[dict], keys: List[str], known: dict, pending: dict, results: List[dict]) -> List[dict]:
+    """缓存新结果，并按原始子任务顺序展开（重复的子任务共享同一结果）"""
+    with _research_cache_lock:
+        for key, result in zip(pending, results):
+            known[key] = _research_cache[key] = {
+                "compressed_research": result["compressed_research"],
+                "raw_notes": result.get("raw_notes", [])
+            }
+        while len(_research_cache) > RESEARCH_CACHE_SIZE:
+            _research_cache.popitem(last=False)
+    return _collect_results(subtasks, [known[key] for key in keys])
+
+
+def run_subtasks(subtasks: List[dict]) -> List[dict]:
+    """
+    并行运行所有子任务的 research agent（同步版本）
+
+    子任务之间相互独立，`batch` 会在线程池中并发执行，总耗时约等于最慢的子任务。
+    重复的子任务只执行一次，已缓存的子任务直接复用之前的结果。
+
+    Args:
+        subtasks: 子任务列表（包含 task 字段）
+
+    Returns:
+        List[dict]: 各子任务的研究结果
+    """
+    keys, known, pending = _plan_subtasks(subtasks)
+    results = []
+    if pending:
+        results = researcher_agent.batch([_subtask_state(task) for task in pending.values()])
+    return _finish_subtasks(subtasks, keys, known, pending, results)
+
+
+async def arun_subtasks(subtasks: List[dict]) -> List[dict]:
+    """
+    并行运行所有子任务的 research agent（异步版本，asyncio.gather + ainvoke）
+
+    Args:
+        subtasks: 子任务列表（包含 task 字段）
+
+    Returns:
+        List[dict]: 各子任务的研究结果
+    """
+    keys, known, pending = _plan_subtasks(subtasks)
+    results = await asyncio.gather(
+        *(researcher_agent.ainvoke(_subtask_state(task)) for task in pending.values())
+    )
+    return _finish_subtasks(subtasks, keys, known, pending, results)
 
 
 # ===== 简化的 Supervisor Graph =====
@@ -119,11 +278,12 @@ def create_supervisor_graph():
     """
     from langgraph.graph import StateGraph, START, END
 
-    # 定义状态
-    class SupervisorState(dict):
+    # 定义状态（TypedDict 才能被 LangGraph 解析为带 reducer 的 schema）
+    class SupervisorState(TypedDict):
         research_question: str
         subtasks: List[dict]
         agent_results: List[dict]
+        messages: Annotated[List[AnyMessage], add_messages]
         final_report: str
 
     # 定义节点
@@ -136,34 +296,31 @@ def create_supervisor_graph():
         }
 
     def research_node(state: SupervisorState):
-        """研究执行节点（简化版，实际应该并行调用多个 Agent）"""
-        agent_results = []
-
-        for subtask in state["subtasks"]:
-            # 调用 research agent
-            agent_state: ResearcherState = {
-                "researcher_messages": [HumanMessage(content=subtask["task"])],
-                "tool_call_iterations": 0,
-                "research_topic": subtask["task"],
-                "compressed_research": "",
-                "raw_notes": []
-            }
-
-            # 运行 research agent
-            result = researcher_agent.invoke(agent_state)
-            agent_results.append({
-                "task": subtask["task"],
-                "compressed_research": result["compressed_research"],
-                "raw_notes": result.get("raw_notes", [])
-            })
+        """研究执行节点：所有子任务的 research agent 并行执行"""
+        return {"agent_results": run_subtasks(state["subtasks"])}
 
-        return {"agent_results": agent_results}
+    async def aresearch_node(state: SupervisorState):
+        """研究执行节点（异步）：ainvoke 时使用 asyncio.gather 并发执行"""
+        return {"agent_results": await arun_subtasks(state["subtasks"])}
 
     def aggregate_node(state: SupervisorState):
         """结果聚合节点"""
         final_report = aggregate_results(
             state["research_question"],
-            state["agent_results"]
+            state["agent_results"],
+            on_chunk=report_chunk_writer()
+        )
+        return {
+            "final_report": final_report,
+            "messages": [AIMessage(content="研究报告已完成")]
+        }
+
+    async def aaggregate_node(state: SupervisorState):
+        """结果聚合节点（异步）"""
+        final_report = await aaggregate_results(
+            state["research_question"],
+            state["agent_results"],
+            on_chunk=report_chunk_writer()
         )
         return {
             "final_report": final_report,
@@ -173,15 +330,16 @@ def create_supervisor_graph():
     # 构建图
     builder = StateGraph(SupervisorState)
     builder.add_node("delegate", delegate_node)
-    builder.add_node("research", research_node)
-    builder.add_node("aggregate", aggregate_node)
+    # invoke / stream 走同步实现，ainvoke / astream 走异步实现
+    builder.add_node("research", RunnableLambda(research_node, afunc=aresearch_node))
+    builder.add_node("aggregate", RunnableLambda(aggregate_node, afunc=aaggregate_node))
 
     builder.add_edge(START, "delegate")
     builder.add_edge("delegate", "research")
     builder.add_edge("research", "aggregate")
     builder.add_edge("aggregate", END)
 
-    return builder.compile()
+    return builder.compile(checkpointer=get_checkpointer())
 
 
 # ===== 编译图 =====
@@ -88,7 +88,7 @@ transform_messages_into_research_topic_prompt = """你将收到一组迄今为
 - 如果查询是特定语言，优先考虑以该语言发布的来源。
 """
 
-research_agent_prompt =  """你是一个研究助手，正在对用户的输入主题进行研究。作为背景，今天的日期是 {date}。
+research_agent_prompt =  """你是一个研究助手，正在对用户的输入主题进行研究。
 
 <Task>
 你的工作是使用工具收集有关用户输入主题的信息。
@@ -132,6 +132,8 @@ research_agent_prompt =  """你是一个研究助手，正在对用户的输入
 - 我有足够的信息来全面回答问题吗?
 - 我应该继续搜索还是提供我的答案?
 </Show Your Thinking>
+
+作为背景，今天的日期是 {date}。
 """
 
 summarize_webpage_prompt = """你的任务是总结从网络搜索中检索到的网页的原始内容。你的目标是创建一个保留原始网页最重要信息的摘要。此摘要将被下游研究代理使用，因此保持关键细节而不丢失重要信息至关重要。
@@ -194,7 +196,7 @@ summarize_webpage_prompt = """你的任务是总结从网络搜索中检索到
 """
 
 # 用于MCP (Model Context Protocol) 文件访问的研究代理prompt
-research_agent_prompt_with_mcp = """你是一个使用本地文件对用户输入主题进行研究的研究助手。作为背景，今天的日期是 {date}。
+research_agent_prompt_with_mcp = """你是一个使用本地文件对用户输入主题进行研究的研究助手。
 
 <Task>
 你的工作是使用文件系统工具从本地研究文件中收集信息。
@@ -243,9 +245,11 @@ research_agent_prompt_with_mcp = """你是一个使用本地文件对用户输
 - 我有足够的信息来全面回答问题吗?
 - 我应该阅读更多文件还是提供我的答案?
 - 始终引用你用于信息的文件
-</Show Your Thinking>"""
+</Show Your Thinking>
+
+作为背景，今天的日期是 {date}。"""
 
-lead_researcher_prompt = """你是一个研究主管。你的工作是通过调用"ConductResearch"工具来进行研究。作为背景，今天的日期是 {date}。
+lead_researcher_prompt = """你是一个研究主管。你的工作是通过调用"ConductResearch"工具来进行研究。
 
 <Task>
 你的重点是调用"ConductResearch"工具来针对用户传入的整体研究问题进行研究。
@@ -301,9 +305,11 @@ lead_researcher_prompt = """你是一个研究主管。你的工作是通过调
 - 一个单独的代理将编写最终报告 - 你只需要收集信息
 - 调用 ConductResearch 时，提供完整的独立说明 - 子代理无法看到其他代理的工作
 - 不要在你的研究问题中使用首字母缩写或缩写，要非常清晰和具体
-</Scaling Rules>"""
+</Scaling Rules>
 
-compress_research_system_prompt = """你是一个研究助手，已通过调用多个工具和网络搜索对一个主题进行了研究。你现在的工作是清理研究发现，但保留研究人员收集的所有相关陈述和信息。作为背景，今天的日期是 {date}。
+作为背景，今天的日期是 {date}。"""
+
+compress_research_system_prompt = """你是一个研究助手，已通过调用多个工具和网络搜索对一个主题进行了研究。你现在的工作是清理研究发现，但保留研究人员收集的所有相关陈述和信息。
 
 <Task>
 你需要清理从现有消息中的工具调用和网络搜索收集的信息。
@@ -348,6 +354,8 @@ think_tool 调用包含战略反思和决策说明，这些是研究过程的内
 </Citation Rules>
 
 关键提醒: 即使是与用户研究主题有任何关联的信息都必须逐字保留，这一点极其重要 (例如，不要重写它，不要总结它，不要改写它)。
+
+作为背景，今天的日期是 {date}。
 """
 
 compress_research_human_message = """以上所有消息都是关于 AI 研究员针对以下研究主题进行的研究:
@@ -5,14 +5,17 @@
 以回答复杂的研究问题。
 """
 
+from functools import lru_cache
+
 from pydantic import BaseModel, Field
 from typing_extensions import Literal
 
 from langgraph.graph import StateGraph, START, END
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, filter_messages
+from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
 from fairy.init_model import init_model
 from fairy.state_research import ResearcherState, ResearcherOutputState
-from fairy.utils import tavily_search, get_today_str, think_tool
+from fairy.utils import tavily_search, get_today_str, think_tool, run_tool_calls, arun_tool_calls, reached_iteration_limit
 from fairy.prompts import research_agent_prompt, compress_research_system_prompt, compress_research_human_message
 
 # ===== 配置 =====
@@ -21,11 +24,27 @@ from fairy.prompts import research_agent_prompt, compress_research_system_prompt
 tools = [tavily_search, think_tool]
 tools_by_name = {tool.name: tool for tool in tools}
 
-# 初始化模型
-model = init_model(model="gpt-4.1")
-model_with_tools = model.bind_tools(tools)
-summarization_model = init_model(model="gpt-4.1-mini")
-compress_model = init_model(model="gpt-4.1")
+# 模型在首次调用时初始化（init_model 按参数缓存，压缩与研究共用同一个客户端）
+@lru_cache(maxsize=1)
+def get_model_with_tools():
+    """绑定了研究工具的模型。"""
+    return init_model(model="gpt-4.1").bind_tools(tools)
+
+def get_compress_model():
+    """压缩研究结果使用的模型。"""
+    return init_model(model="gpt-4.1")
+
+# 系统提示词以静态指令开头、日期放在末尾，同一天内每轮复用同一个 SystemMessage，
+# 便于模型服务端的前缀缓存命中，也省去每轮重新 format 长提示词。
+@lru_cache(maxsize=2)
+def research_system_message(date: str) -> SystemMessage:
+    """研究代理的系统消息（按日期缓存）。"""
+    return SystemMessage(content=research_agent_prompt.format(date=date))
+
+@lru_cache(maxsize=2)
+def compress_system_message(date: str) -> SystemMessage:
+    """压缩研究的系统消息（按日期缓存）。"""
+    return SystemMessage(content=compress_research_system_prompt.format(date=date))
 
 # ===== 代理节点 =====
 
@@ -38,39 +57,36 @@ def llm_call(state: ResearcherState):
 
     返回包含模型响应的更新状态。
     """
+    response = get_model_with_tools().invoke(
+        [research_system_message(get_today_str())]
+        + state["researcher_messages"]
+    )
+    return {
+        "researcher_messages": [response],
+        "note_parts": [str(response.content)],
+        "tool_call_iterations": state.get("tool_call_iterations", 0) + 1,
+    }
+
+def _tool_update(tool_outputs: list) -> dict:
+    """工具节点的状态更新：工具消息及其文本（追加到 note_parts）。"""
     return {
-        "researcher_messages": [
-            model_with_tools.invoke(
-                [SystemMessage(content=research_agent_prompt.format(date=get_today_str()))]
-                + state["researcher_messages"]
-            )
-        ]
+        "researcher_messages": tool_outputs,
+        "note_parts": [str(m.content) for m in tool_outputs],
     }
 
 def tool_node(state: ResearcherState):
     """执行上一次 LLM 响应中的所有工具调用。
 
-    执行前一次 LLM 响应中的全部工具调用，
+    执行前一次 LLM 响应中的全部工具调用（相互独立的调用并发执行），
     返回包含工具执行结果的更新状态。
     """
     tool_calls = state["researcher_messages"][-1].tool_calls
+    return _tool_update(run_tool_calls(tools_by_name, tool_calls))
 
-    # 执行所有工具调用
-    observations = []
-    for tool_call in tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observations.append(tool.invoke(tool_call["args"]))
-
-    # 创建工具消息输出
-    tool_outputs = [
-        ToolMessage(
-            content=observation,
-            name=tool_call["name"],
-            tool_call_id=tool_call["id"]
-        ) for observation, tool_call in zip(observations, tool_calls)
-    ]
-
-    return {"researcher_messages": tool_outputs}
+async def atool_node(state: ResearcherState):
+    """tool_node 的异步版本，通过 asyncio.gather 并发执行全部工具调用。"""
+    tool_calls = state["researcher_messages"][-1].tool_calls
+    return _tool_update(await arun_tool_calls(tools_by_name, tool_calls))
 
 def compress_research(state: ResearcherState) -> dict:
     """将研究发现压缩为简洁的摘要。
@@ -79,26 +95,22 @@ def compress_research(state: ResearcherState) -> dict:
     上级代理决策使用的精炼摘要。
     """
 
-    system_message = compress_research_system_prompt.format(date=get_today_str())
     research_topic = state.get("research_topic", "")
+    researcher_messages = list(state.get("researcher_messages", []))
+    # 因轮数上限结束时，最后一条 AI 消息的工具调用没有对应的工具结果，不发送给模型
+    if researcher_messages and getattr(researcher_messages[-1], "tool_calls", None):
+        researcher_messages = researcher_messages[:-1]
     messages = (
-        [SystemMessage(content=system_message)]
-        + state.get("researcher_messages", [])
+        [compress_system_message(get_today_str())]
+        + researcher_messages
         + [HumanMessage(content=compress_research_human_message.format(research_topic=research_topic))]
     )
-    response = compress_model.invoke(messages)
-
-    # 从工具消息和 AI 消息中提取原始笔记
-    raw_notes = [
-        str(m.content) for m in filter_messages(
-            state["researcher_messages"], 
-            include_types=["tool", "ai"]
-        )
-    ]
+    response = get_compress_model().invoke(messages)
 
+    # 原始笔记由 llm_call / tool_node 逐步累积，无需再扫描消息历史
     return {
         "compressed_research": str(response.content),
-        "raw_notes": ["\n".join(raw_notes)]
+        "raw_notes": ["\n".join(state.get("note_parts", []))]
     }
 
 # ===== 路由逻辑 =====
@@ -116,8 +128,8 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     messages = state["researcher_messages"]
     last_message = messages[-1]
 
-    # 如果 LLM 发起工具调用，则继续执行工具
-    if last_message.tool_calls:
+    # 如果 LLM 发起工具调用且未达到轮数上限，则继续执行工具
+    if last_message.tool_calls and not reached_iteration_limit(state):
         return "tool_node"
     # 否则，返回最终答案
     return "compress_research"
@@ -129,7 +141,8 @@ agent_builder = StateGraph(ResearcherState, output_schema=ResearcherOutputState)
 
 # 向图中添加节点
 agent_builder.add_node("llm_call", llm_call)
-agent_builder.add_node("tool_node", tool_node)
+# invoke / stream 走同步实现，ainvoke / astream 走异步实现
+agent_builder.add_node("tool_node", RunnableLambda(tool_node, afunc=atool_node))
 agent_builder.add_node("compress_research", compress_research)
 
 # 添加边以连接节点
@@ -9,13 +9,16 @@
 """
 
 from typing import Literal, List
+from typing_extensions import Annotated, TypedDict
 from datetime import datetime
 
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage, filter_messages
+from langchain_core.messages import AnyMessage, SystemMessage, AIMessage, ToolMessage, filter_messages
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 
-from fairy.init_model import init_model
+from fairy.checkpoint import get_checkpointer
 from fairy.prompts import (
     research_agent_prompt,
     lead_researcher_prompt,
@@ -26,16 +29,12 @@ from fairy.prompts import (
 from fairy.utils import tavily_search, get_today_str, think_tool
 from fairy.research_agent_scope import scope_research
 
-# ===== 配置 =====
-
-model = init_model(model="gpt-4.1")
-
 # ===== 完整版状态 =====
 
-class FullResearchState(dict):
+class FullResearchState(TypedDict):
     """完整研究系统的状态"""
     # 输入
-    messages: List
+    messages: Annotated[List[AnyMessage], add_messages]
     research_question: str
 
     # 范围界定阶段
@@ -84,38 +83,44 @@ def supervisor_node(state: FullResearchState):
 
 
 def research_node(state: FullResearchState):
-    """研究执行节点"""
-    from fairy.research_agent import researcher_agent
-
-    agent_results = []
-
-    for subtask in state["subtasks"]:
-        # 调用 research agent
-        agent_state = {
-            "researcher_messages": [HumanMessage(content=subtask["task"])],
-            "tool_call_iterations": 0,
-            "research_topic": subtask["task"],
-            "compressed_research": "",
-            "raw_notes": []
-        }
+    """研究执行节点：所有子任务的 research agent 并行执行"""
+    from fairy.multi_agent_supervisor import run_subtasks
+
+    return {"agent_results": run_subtasks(state["subtasks"])}
+
 
-        result = researcher_agent.invoke(agent_state)
-        agent_results.append({
-            "task": subtask["task"],
-            "compressed_research": result["compressed_research"],
-            "raw_notes": result.get("raw_notes", [])
-        })
+async def aresearch_node(state: FullResearchState):
+    """研究执行节点（异步）：ainvoke 时使用 asyncio.gather 并发执行"""
+    from fairy.multi_agent_supervisor import arun_subtasks
 
-    return {"agent_results": agent_results}
+    return {"agent_results": await arun_subtasks(state["subtasks"])}
 
 
 def aggregate_node(state: FullResearchState):
     """聚合节点 - 生成最终报告"""
-    from fairy.multi_agent_supervisor import aggregate_results
+    from fairy.multi_agent_supervisor import aggregate_results, report_chunk_writer
 
     research_question = state.get("research_brief", state["research_question"])
 
-    final_report = aggregate_results(research_question, state["agent_results"])
+    final_report = aggregate_results(
+        research_question, state["agent_results"], on_chunk=report_chunk_writer()
+    )
+
+    return {
+        "final_report": final_report,
+        "messages": [AIMessage(content="✅ 研究完成！")]
+    }
+
+
+async def aaggregate_node(state: FullResearchState):
+    """聚合节点（异步）：报告通过 model.astream 流式生成"""
+    from fairy.multi_agent_supervisor import aaggregate_results, report_chunk_writer
+
+    research_question = state.get("research_brief", state["research_question"])
+
+    final_report = await aaggregate_results(
+        research_question, state["agent_results"], on_chunk=report_chunk_writer()
+    )
 
     return {
         "final_report": final_report,
@@ -144,8 +149,9 @@ def build_full_agent():
     # 添加节点
     builder.add_node("scope", scope_node)
     builder.add_node("supervisor", supervisor_node)
-    builder.add_node("research", research_node)
-    builder.add_node("aggregate", aggregate_node)
+    # invoke / stream 走同步实现，ainvoke / astream 走异步实现
+    builder.add_node("research", RunnableLambda(research_node, afunc=aresearch_node))
+    builder.add_node("aggregate", RunnableLambda(aggregate_node, afunc=aaggregate_node))
 
     # 添加边
     builder.add_edge(START, "scope")
@@ -161,7 +167,7 @@ def build_full_agent():
     builder.add_edge("research", "aggregate")
     builder.add_edge("aggregate", END)
 
-    return builder.compile()
+    return builder.compile(checkpointer=get_checkpointer())
 
 
 # 编译
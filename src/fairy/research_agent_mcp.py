@@ -5,24 +5,32 @@
 通过 MCP 协议访问本地文件进行研究。
 """
 
+import mmap
+import os
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+
 from typing_extensions import Literal
 from datetime import datetime
 
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, filter_messages
+from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 
+from fairy.checkpoint import get_checkpointer
 from fairy.init_model import init_model
 from fairy.state_research import ResearcherState, ResearcherOutputState
 from fairy.prompts import research_agent_prompt_with_mcp
-from fairy.utils import get_today_str, think_tool
-
-# ===== 配置 =====
-
-# 初始化模型
-model = init_model(model="gpt-4.1")
+from fairy.utils import get_today_str, think_tool, run_tool_calls, arun_tool_calls, reached_iteration_limit
 
 # ===== MCP 工具（模拟） =====
 
+# 批量读取文件时的最大并发数
+FILE_READ_MAX_WORKERS = 16
+
 # 注意：这里需要根据实际的 MCP server 配置来定义工具
 # 以下是示例工具定义
 
@@ -48,30 +56,100 @@ def read_file(path: str) -> str:
         return f"错误: {str(e)}"
 
 def read_multiple_files(paths: list) -> str:
-    """读取多个文件"""
-    results = []
-    for path in paths:
-        content = read_file(path)
-        results.append(f"=== {path} ===\n{content}")
-    return "\n\n".join(results)
+    """读取多个文件（线程池并发读取，按传入顺序拼接）"""
+    if len(paths) <= 1:
+        contents = [read_file(path) for path in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=min(FILE_READ_MAX_WORKERS, len(paths))) as executor:
+            contents = list(executor.map(read_file, paths))
+    return "\n\n".join(f"=== {path} ===\n{content}" for path, content in zip(paths, contents))
+
+# 搜索的文件类型与单文件大小上限（超过上限的文件视为非文本，直接跳过）
+SEARCH_FILE_SUFFIXES = (".txt", ".md")
+SEARCH_MAX_FILE_SIZE = 100 * 1024 * 1024
+BINARY_SNIFF_SIZE = 4096
+SEARCH_MAX_WORKERS = 32
+
+# 模块加载时探测一次 ripgrep，存在时优先使用
+_RG_PATH = shutil.which("rg")
+
+
+def _rg_search_files(query: str, directory: str) -> list[str]:
+    """用 ripgrep 搜索（并行、内存映射），返回匹配的文件路径"""
+    completed = subprocess.run(
+        [
+            _RG_PATH, "-l", "-i", "-F",
+            "--no-ignore", "--hidden", "--no-messages",
+            f"--max-filesize={SEARCH_MAX_FILE_SIZE}",
+            "--type-add=doc:*.{txt,md}", "-tdoc",
+            "--", query, directory,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    # 退出码 1 表示没有匹配，2 表示出错（部分文件不可读时也可能有结果）
+    return sorted(line for line in completed.stdout.splitlines() if line)
+
+
+def _matches_bytes(pattern: "re.Pattern[bytes]", file_path: str) -> bool:
+    """在 mmap 映射的文件字节上直接匹配，不把文件内容复制成 Python 字符串"""
+    with open(file_path, "rb") as f:
+        # 开头 4KB 含 NUL 字节的视为二进制文件
+        if b"\0" in f.read(BINARY_SNIFF_SIZE):
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return pattern.search(mm) is not None
+
+
+def _matches_text(pattern: "re.Pattern[str]", file_path: str) -> bool:
+    """解码后匹配（查询包含非 ASCII 的大小写字母时使用）"""
+    with open(file_path, "rb") as f:
+        return pattern.search(f.read().decode("utf-8", "ignore")) is not None
+
+
+def _py_search_files(query: str, directory: str) -> list[str]:
+    """无 ripgrep 时的回退实现：线程池并发读取 + 预编译的忽略大小写正则"""
+    # 字节正则的 IGNORECASE 只折叠 ASCII 字母；查询中没有其他大小写字母时（如英文、中文）
+    # 直接在 mmap 上匹配 UTF-8 字节，否则退回解码后匹配
+    if all(c.isascii() or c.lower() == c.upper() for c in query):
+        pattern = re.compile(re.escape(query.encode("utf-8")), re.IGNORECASE)
+        match_file = partial(_matches_bytes, pattern)
+    else:
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        match_file = partial(_matches_text, pattern)
+
+    candidates = [
+        os.path.join(root, file)
+        for root, dirs, files in os.walk(directory)
+        for file in files
+        if file.endswith(SEARCH_FILE_SUFFIXES)
+    ]
+
+    def matches(file_path: str) -> bool:
+        try:
+            size = os.path.getsize(file_path)
+            if size > SEARCH_MAX_FILE_SIZE:
+                return False
+            if size == 0:
+                # 空文件无法 mmap，只有空查询能匹配
+                return not query
+            return match_file(file_path)
+        except (OSError, ValueError):
+            return False
+
+    if not candidates:
+        return []
+    with ThreadPoolExecutor(max_workers=min(SEARCH_MAX_WORKERS, len(candidates))) as executor:
+        hits = list(executor.map(matches, candidates))
+    return [path for path, hit in zip(candidates, hits) if hit]
+
 
 def search_files(query: str, directory: str = ".") -> str:
     """搜索文件内容"""
-    import os
-    import glob
-
-    results = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.txt') or file.endswith('.md'):
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if query.lower() in content.lower():
-                            results.append(file_path)
-                except:
-                    pass
+    if _RG_PATH:
+        results = _rg_search_files(query, directory)
+    else:
+        results = _py_search_files(query, directory)
 
     return "\n".join(results) if results else "未找到匹配的文件"
 
@@ -128,52 +206,61 @@ tools = [
 ]
 
 tools_by_name = {tool.name: tool for tool in tools}
-model_with_tools = model.bind_tools(tools)
+
+
+# 模型在首次调用时初始化
+@lru_cache(maxsize=1)
+def get_model_with_tools():
+    """绑定了 MCP 文件工具的模型"""
+    return init_model(model="gpt-4.1").bind_tools(tools)
+
+
+# 系统提示词以静态指令开头、日期放在末尾，同一天内每轮复用同一个 SystemMessage
+@lru_cache(maxsize=2)
+def research_system_message(date: str) -> SystemMessage:
+    """MCP 研究代理的系统消息（按日期缓存）"""
+    return SystemMessage(content=research_agent_prompt_with_mcp.format(date=date))
 
 
 # ===== 代理节点 =====
 
 def llm_call(state: ResearcherState):
     """分析当前状态并决定下一步行动"""
+    response = get_model_with_tools().invoke(
+        [research_system_message(get_today_str())]
+        + state["researcher_messages"]
+    )
     return {
-        "researcher_messages": [
-            model_with_tools.invoke(
-                [SystemMessage(content=research_agent_prompt_with_mcp.format(date=get_today_str()))]
-                + state["researcher_messages"]
-            )
-        ]
+        "researcher_messages": [response],
+        "note_parts": [str(response.content)],
+        "tool_call_iterations": state.get("tool_call_iterations", 0) + 1,
+    }
+
+
+def _tool_update(tool_outputs: list) -> dict:
+    """工具节点的状态更新：工具消息及其文本（追加到 note_parts）。"""
+    return {
+        "researcher_messages": tool_outputs,
+        "note_parts": [str(m.content) for m in tool_outputs],
     }
 
 
 def tool_node(state: ResearcherState):
-    """执行工具调用"""
+    """执行工具调用（相互独立的调用并发执行）"""
     tool_calls = state["researcher_messages"][-1].tool_calls
+    return _tool_update(run_tool_calls(tools_by_name, tool_calls))
 
-    observations = []
-    for tool_call in tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observations.append(tool.invoke(tool_call["args"]))
-
-    tool_outputs = [
-        ToolMessage(
-            content=observation,
-            name=tool_call["name"],
-            tool_call_id=tool_call["id"]
-        ) for observation, tool_call in zip(observations, tool_calls)
-    ]
 
-    return {"researcher_messages": tool_outputs}
+async def atool_node(state: ResearcherState):
+    """执行工具调用（异步，asyncio.gather 并发）"""
+    tool_calls = state["researcher_messages"][-1].tool_calls
+    return _tool_update(await arun_tool_calls(tools_by_name, tool_calls))
 
 
 def compress_research(state: ResearcherState) -> dict:
     """压缩研究发现"""
-    # 从工具消息中提取内容
-    raw_notes = [
-        str(m.content) for m in filter_messages(
-            state["researcher_messages"],
-            include_types=["tool", "ai"]
-        )
-    ]
+    # 原始笔记由 llm_call / tool_node 逐步累积，无需再扫描消息历史
+    raw_notes = state.get("note_parts", [])
 
     # 简单压缩（实际可以使用更复杂的逻辑）
     compressed = "\n\n".join(raw_notes)
@@ -191,7 +278,7 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     messages = state["researcher_messages"]
     last_message = messages[-1]
 
-    if last_message.tool_calls:
+    if last_message.tool_calls and not reached_iteration_limit(state):
         return "tool_node"
     return "compress_research"
 
@@ -201,7 +288,8 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
 agent_builder = StateGraph(ResearcherState, output_schema=ResearcherOutputState)
 
 agent_builder.add_node("llm_call", llm_call)
-agent_builder.add_node("tool_node", tool_node)
+# invoke / stream 走同步实现，ainvoke / astream 走异步实现
+agent_builder.add_node("tool_node", RunnableLambda(tool_node, afunc=atool_node))
 agent_builder.add_node("compress_research", compress_research)
 
 agent_builder.add_edge(START, "llm_call")
@@ -216,4 +304,4 @@ agent_builder.add_conditional_edges(
 agent_builder.add_edge("tool_node", "llm_call")
 agent_builder.add_edge("compress_research", END)
 
-agent_mcp = agent_builder.compile()
+agent_mcp = agent_builder.compile(checkpointer=get_checkpointer())
@@ -9,7 +9,8 @@
 判断是否有足够的上下文信息来进行研究。
 """
 
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
 from typing_extensions import Literal
 
 from langchain_core.messages import HumanMessage, AIMessage, get_buffer_string
@@ -22,15 +23,20 @@ from fairy.state_scope import AgentState, ClarifyWithUser, ResearchQuestion, Age
 # ===== 工具函数 =====
 
 def get_today_str() -> str:
-    """获取当前日期的人类可读格式。"""
-    return datetime.now().strftime("%a %b %-d, %Y")
+    """获取当前日期的人类可读格式（按日缓存，跨过零点后自动更新）。"""
+    return _format_day(date.today().toordinal())
+
+@lru_cache(maxsize=2)
+def _format_day(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime("%a %b %-d, %Y")
 
 # ===== 配置 =====
 
 from fairy.init_model import init_model
 
-# 初始化模型
-model = init_model(model="gpt-4.1")
+# 模型在首次调用时初始化（init_model 按参数缓存，各模块共享同一个客户端）
+def get_model():
+    return init_model(model="gpt-4.1")
 
 # ===== 工作流节点 =====
 
@@ -42,7 +48,7 @@ def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brie
     根据情况路由到研究简报生成节点，或以澄清问题结束。
     """
     # 设置结构化输出模型
-    structured_output_model = model.with_structured_output(ClarifyWithUser)
+    structured_output_model = get_model().with_structured_output(ClarifyWithUser)
 
     # 使用澄清指令调用模型
     response = structured_output_model.invoke([
@@ -72,7 +78,7 @@ def write_research_brief(state: AgentState):
     并包含有效研究所需的全部必要细节。
     """
     # 设置结构化输出模型
-    structured_output_model = model.with_structured_output(ResearchQuestion)
+    structured_output_model = get_model().with_structured_output(ResearchQuestion)
 
     # 从对话历史生成研究简报
     response = structured_output_model.invoke([
@@ -26,6 +26,8 @@ class ResearcherState(TypedDict):
     research_topic: str
     compressed_research: str
     raw_notes: Annotated[List[str], operator.add]
+    # 每步追加的 AI / 工具输出文本，compress_research 直接拼接为 raw_notes
+    note_parts: Annotated[List[str], operator.add]
 
 class ResearcherOutputState(TypedDict):
     """
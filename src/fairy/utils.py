@@ -5,24 +5,41 @@
 包括网络搜索功能和内容摘要工具。
 """
 
+import asyncio
+import importlib.util
+import io
+import logging
+import os
+from functools import lru_cache, partial
 from pathlib import Path
-from datetime import datetime
+from datetime import date
 from typing_extensions import Annotated, List, Literal
 
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import tool, InjectedToolArg
-from tavily import TavilyClient
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import StructuredTool, tool, InjectedToolArg
+from tavily import AsyncTavilyClient, TavilyClient
 
 from fairy.state_research import Summary
 from fairy.prompts import summarize_webpage_prompt
 
+logger = logging.getLogger(__name__)
+
 # ===== 工具函数 =====
 
 def get_today_str() -> str:
-    """获取当前日期的人类可读格式。"""
-    return datetime.now().strftime("%a %b %-d, %Y")
+    """获取当前日期的人类可读格式（按日缓存，跨过零点后自动更新）。"""
+    return _format_day(date.today().toordinal())
+
+@lru_cache(maxsize=2)
+def _format_day(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime("%a %b %-d, %Y")
 
 def get_current_dir() -> Path:
     """获取模块所在的当前目录。
@@ -41,8 +58,64 @@ def get_current_dir() -> Path:
 
 from fairy.init_model import init_model
 
-summarization_model = init_model(model="gpt-4.1-mini")
-tavily_client = TavilyClient()
+# 同一次搜索中并发摘要的最大网页数
+SUMMARIZATION_MAX_CONCURRENCY = 16
+# 原始内容短于该长度的网页直接使用原文，不再额外请求一次摘要模型
+SUMMARY_MIN_CHARS = 2000
+# 原始内容超过该长度的网页按 SUMMARY_CHUNK_CHARS 分块摘要后再合并
+SUMMARY_MAX_CHARS = 50000
+SUMMARY_CHUNK_CHARS = 20000
+# Tavily 客户端的连接池上限与并发搜索数匹配：
+# requests 默认每个主机只保留 10 个连接，并发更高时多余的连接用完即关闭，下次重新握手。
+# 同步 Session 在进程内共享；异步客户端绑定事件循环，每个循环各建一个（见 get_async_tavily_client）
+TAVILY_MAX_CONNECTIONS = 64
+
+def _tavily_session() -> requests.Session:
+    """同步客户端使用的 Session，扩大连接池以容纳线程池中的并发搜索。"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=TAVILY_MAX_CONNECTIONS)
+    session.mount("https://", adapter)
+    return session
+
+def _tavily_async_client() -> httpx.AsyncClient:
+    """异步客户端使用的 httpx 连接池（每个事件循环一个）；安装了 h2 时启用 HTTP/2 多路复用。"""
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        # 与 SDK 自建客户端保持一致，支持 TAVILY_HTTPS_PROXY
+        proxy=os.getenv("TAVILY_HTTPS_PROXY"),
+        limits=httpx.Limits(
+            max_connections=TAVILY_MAX_CONNECTIONS,
+            max_keepalive_connections=TAVILY_MAX_CONNECTIONS // 2,
+            keepalive_expiry=60,
+        ),
+    )
+
+# 模型和 HTTP 客户端在首次使用时创建并在进程内复用：
+# 创建时需要加载 TLS 证书等，放在导入阶段会拖慢只用到部分功能的进程启动
+
+@lru_cache(maxsize=1)
+def get_structured_summarization_model():
+    """结构化输出的摘要模型，所有摘要调用共享。"""
+    return init_model(model="gpt-4.1-mini").with_structured_output(Summary)
+
+@lru_cache(maxsize=1)
+def get_tavily_client() -> TavilyClient:
+    return TavilyClient(session=_tavily_session())
+
+# httpx.AsyncClient 的连接绑定在创建它的事件循环上，跨循环复用会在旧循环关闭后报错，
+# 因此异步客户端按事件循环分别缓存
+_async_tavily_clients: "dict[asyncio.AbstractEventLoop, AsyncTavilyClient]" = {}
+
+def get_async_tavily_client() -> AsyncTavilyClient:
+    """返回当前事件循环专用的 AsyncTavilyClient（须在协程中调用）。"""
+    running = asyncio.get_running_loop()
+    client = _async_tavily_clients.get(running)
+    if client is None:
+        # 丢弃已关闭循环的客户端，不再保留其中已失效的 keep-alive 连接
+        for closed in [loop for loop in _async_tavily_clients if loop.is_closed()]:
+            del _async_tavily_clients[closed]
+        client = _async_tavily_clients[running] = AsyncTavilyClient(client=_tavily_async_client())
+    return client
 
 # ===== 搜索函数 =====
 
@@ -52,7 +125,12 @@ def tavily_search_multiple(
     topic: Literal["general", "news", "finance"] = "general", 
     include_raw_content: bool = True, 
 ) -> List[dict]:
-    """使用 Tavily API 执行多个查询的搜索。
+    """使用 Tavily API 执行多个查询的搜索（同步版本）。
+
+    多个查询通过线程池并发执行，总耗时约为最慢的单次查询。
+    与异步版本一致，失败的查询会被记录并跳过，不影响其他查询的结果。
+    同步调用方（例如 `graph.invoke`）可能没有事件循环，也可能位于其他事件循环中，
+    因此这里不通过 `asyncio.run` 复用异步客户端。
 
     参数：
         search_queries: 要执行的搜索查询列表
@@ -63,18 +141,66 @@ def tavily_search_multiple(
     返回值：
         搜索结果字典列表
     """
+    client = get_tavily_client()
+
+    def search(query: str):
+        try:
+            return client.search(
+                query,
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+                topic=topic
+            )
+        except Exception as e:
+            logger.warning("搜索失败 (%s): %s", query, e)
+            return None
+
+    if len(search_queries) <= 1:
+        results = [search(query) for query in search_queries]
+    else:
+        with ContextThreadPoolExecutor(max_workers=len(search_queries)) as pool:
+            results = list(pool.map(search, search_queries))
+    return [result for result in results if result is not None]
+
+async def atavily_search_multiple(
+    search_queries: List[str],
+    max_results: int = 3,
+    topic: Literal["general", "news", "finance"] = "general",
+    include_raw_content: bool = True,
+) -> List[dict]:
+    """使用 AsyncTavilyClient 并发执行多个查询的搜索。
+
+    失败的查询会被记录并跳过，不影响其他查询的结果。
+
+    参数：
+        search_queries: 要执行的搜索查询列表
+        max_results: 每个查询返回的最大结果数
+        topic: 搜索结果的主题过滤器
+        include_raw_content: 是否包含原始网页内容
+
+    返回值：
+        搜索结果字典列表
+    """
+    client = get_async_tavily_client()
+    results = await asyncio.gather(
+        *(
+            client.search(
+                query,
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+                topic=topic
+            )
+            for query in search_queries
+        ),
+        return_exceptions=True,
+    )
 
-    # 顺序执行搜索。注意：可使用 AsyncTavilyClient 来并行化此步骤。
     search_docs = []
-    for query in search_queries:
-        result = tavily_client.search(
-            query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            topic=topic
-        )
+    for query, result in zip(search_queries, results):
+        if isinstance(result, BaseException):
+            logger.warning("搜索失败 (%s): %s", query, result)
+            continue
         search_docs.append(result)
-
     return search_docs
 
 def summarize_webpage_content(webpage_content: str) -> str:
@@ -87,28 +213,32 @@ def summarize_webpage_content(webpage_content: str) -> str:
         包含关键摘录的格式化摘要
     """
     try:
-        # 设置用于摘要的结构化输出模型
-        structured_model = summarization_model.with_structured_output(Summary)
-
-        # 生成摘要
-        summary = structured_model.invoke([
-            HumanMessage(content=summarize_webpage_prompt.format(
-                webpage_content=webpage_content, 
-                date=get_today_str()
-            ))
-        ])
-
-        # 以清晰的结构格式化摘要
-        formatted_summary = (
-            f"<summary>\n{summary.summary}\n</summary>\n\n"
-            f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
-        )
-
-        return formatted_summary
+        summary = get_structured_summarization_model().invoke(_summarize_messages(webpage_content, get_today_str()))
+        return _format_summary(summary)
 
     except Exception as e:
-        print(f"网页摘要失败: {str(e)}")
-        return webpage_content[:1000] + "..." if len(webpage_content) > 1000 else webpage_content
+        return _summary_fallback(webpage_content, e)
+
+def _summarize_messages(webpage_content: str, date: str) -> list:
+    """构建单个网页的摘要请求消息。"""
+    return [
+        HumanMessage(content=summarize_webpage_prompt.format(
+            webpage_content=webpage_content,
+            date=date
+        ))
+    ]
+
+def _format_summary(summary: Summary) -> str:
+    """以清晰的结构格式化摘要。"""
+    return (
+        f"<summary>\n{summary.summary}\n</summary>\n\n"
+        f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
+    )
+
+def _summary_fallback(webpage_content: str, error: BaseException) -> str:
+    """摘要失败时退回截断后的原始内容。"""
+    logger.warning("网页摘要失败: %s", error)
+    return webpage_content[:1000] + "..." if len(webpage_content) > 1000 else webpage_content
 
 def deduplicate_search_results(search_results: List[dict]) -> dict:
     """按 URL 对搜索结果去重，避免处理重复内容。
@@ -132,21 +262,114 @@ def deduplicate_search_results(search_results: List[dict]) -> dict:
 def process_search_results(unique_results: dict) -> dict:
     """处理搜索结果，在可能的情况下生成内容摘要。
 
+    短网页直接使用原文；超长网页先分块摘要，再把各块摘要合并为一份（map-reduce）。
+    同一阶段的所有摘要请求通过一次 batch 调用并发执行。
+
     参数：
         unique_results: 唯一搜索结果的字典
 
     返回值：
         包含摘要的已处理结果字典
     """
+    chunk_counts, inputs = _summarization_inputs(unique_results)
+    chunk_summaries = _group_chunk_summaries(chunk_counts, _batch_summaries(inputs))
+
+    reduce_urls, reduce_inputs = _reduce_inputs(chunk_summaries)
+    summary_by_url = {url: parts[0] for url, parts in chunk_summaries.items()}
+    summary_by_url.update(zip(reduce_urls, _batch_summaries(reduce_inputs)))
+    return _merge_summaries(unique_results, summary_by_url)
+
+async def aprocess_search_results(unique_results: dict) -> dict:
+    """`process_search_results` 的异步版本，使用 `abatch` 并发摘要。"""
+    chunk_counts, inputs = _summarization_inputs(unique_results)
+    chunk_summaries = _group_chunk_summaries(chunk_counts, await _abatch_summaries(inputs))
+
+    reduce_urls, reduce_inputs = _reduce_inputs(chunk_summaries)
+    summary_by_url = {url: parts[0] for url, parts in chunk_summaries.items()}
+    summary_by_url.update(zip(reduce_urls, await _abatch_summaries(reduce_inputs)))
+    return _merge_summaries(unique_results, summary_by_url)
+
+def _batch_summaries(inputs: list) -> list:
+    """并发执行一批摘要请求，失败的请求以异常对象返回。"""
+    if not inputs:
+        return []
+    return get_structured_summarization_model().batch(
+        inputs,
+        config={"max_concurrency": SUMMARIZATION_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
+
+async def _abatch_summaries(inputs: list) -> list:
+    """`_batch_summaries` 的异步版本。"""
+    if not inputs:
+        return []
+    return await get_structured_summarization_model().abatch(
+        inputs,
+        config={"max_concurrency": SUMMARIZATION_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
+
+def _split_content(raw_content: str) -> List[str]:
+    """超长网页按固定长度分块，其余网页整体作为一块。"""
+    if len(raw_content) <= SUMMARY_MAX_CHARS:
+        return [raw_content]
+    return [
+        raw_content[i:i + SUMMARY_CHUNK_CHARS]
+        for i in range(0, len(raw_content), SUMMARY_CHUNK_CHARS)
+    ]
+
+def _summarization_inputs(unique_results: dict) -> tuple[dict, list]:
+    """挑出需要摘要的网页，返回每个 URL 的分块数和按顺序展开的模型输入。
+
+    原始内容短于 SUMMARY_MIN_CHARS 的网页不摘要，直接使用原文。
+    """
+    date = get_today_str()
+    chunk_counts, inputs = {}, []
+    for url, result in unique_results.items():
+        raw_content = result.get("raw_content") or ""
+        if len(raw_content) < SUMMARY_MIN_CHARS:
+            continue
+        chunks = _split_content(raw_content)
+        chunk_counts[url] = len(chunks)
+        inputs.extend(_summarize_messages(chunk, date) for chunk in chunks)
+    return chunk_counts, inputs
+
+def _group_chunk_summaries(chunk_counts: dict, summaries: list) -> dict:
+    """把 map 阶段的结果按 URL 分组；多块网页只保留成功的块，全部失败时保留第一个异常。"""
+    grouped, offset = {}, 0
+    for url, count in chunk_counts.items():
+        parts = summaries[offset:offset + count]
+        offset += count
+        if count > 1:
+            succeeded = [part for part in parts if not isinstance(part, BaseException)]
+            parts = succeeded or parts[:1]
+        grouped[url] = parts
+    return grouped
+
+def _reduce_inputs(chunk_summaries: dict) -> tuple[list, list]:
+    """为分块摘要多于一份的网页构建合并摘要的模型输入。"""
+    date = get_today_str()
+    urls = [url for url, parts in chunk_summaries.items() if len(parts) > 1]
+    inputs = [
+        _summarize_messages("\n\n".join(_format_summary(part) for part in chunk_summaries[url]), date)
+        for url in urls
+    ]
+    return urls, inputs
+
+def _merge_summaries(unique_results: dict, summary_by_url: dict) -> dict:
+    """将摘要结果按 URL 合并回搜索结果，保持原有顺序。"""
     summarized_results = {}
 
     for url, result in unique_results.items():
-        # 如果没有原始内容可用于摘要，则使用现有内容
-        if not result.get("raw_content"):
-            content = result['content']
+        # 未摘要的网页：短网页使用原文，没有原始内容时使用现有内容
+        if url not in summary_by_url:
+            content = result.get('raw_content') or result['content']
         else:
-            # 对原始内容进行摘要以便更好地处理
-            content = summarize_webpage_content(result['raw_content'])
+            summary = summary_by_url[url]
+            if isinstance(summary, BaseException):
+                content = _summary_fallback(result['raw_content'], summary)
+            else:
+                content = _format_summary(summary)
 
         summarized_results[url] = {
             'title': result['title'],
@@ -155,6 +378,8 @@ def process_search_results(unique_results: dict) -> dict:
 
     return summarized_results
 
+SOURCE_SEPARATOR = "-" * 80 + "\n"
+
 def format_search_output(summarized_results: dict) -> str:
     """将搜索结果格式化为结构清晰的字符串输出。
 
@@ -167,20 +392,168 @@ def format_search_output(summarized_results: dict) -> str:
     if not summarized_results:
         return "未找到有效的搜索结果。请尝试不同的搜索查询或使用其他搜索 API。"
 
-    formatted_output = "搜索结果：\n\n"
+    # 写入同一个缓冲区，避免在循环中反复拼接（复制）越来越长的字符串
+    buffer = io.StringIO()
+    buffer.write("搜索结果：\n\n")
 
     for i, (url, result) in enumerate(summarized_results.items(), 1):
-        formatted_output += f"\n\n--- 来源 {i}: {result['title']} ---\n"
-        formatted_output += f"URL: {url}\n\n"
-        formatted_output += f"摘要：\n{result['content']}\n\n"
-        formatted_output += "-" * 80 + "\n"
+        buffer.write(f"\n\n--- 来源 {i}: {result['title']} ---\n")
+        buffer.write(f"URL: {url}\n\n")
+        buffer.write(f"摘要：\n{result['content']}\n\n")
+        buffer.write(SOURCE_SEPARATOR)
+
+    return buffer.getvalue()
+
+# ===== 跨工具调用的批量搜索 =====
+
+def _search_kwargs(args: dict) -> dict:
+    """从 tavily_search 工具调用参数中取出搜索选项（未提供时使用工具默认值）。"""
+    return {
+        "max_results": args.get("max_results", 3),
+        "topic": args.get("topic", "general"),
+        "include_raw_content": True,
+    }
 
-    return formatted_output
+def _slice_search_outputs(responses: List[dict], summarized_results: dict) -> List[str]:
+    """按各次调用自己的搜索结果，从共享的摘要中切出每个工具调用的输出。"""
+    outputs = []
+    for response in responses:
+        urls = dict.fromkeys(result["url"] for result in response["results"])
+        outputs.append(format_search_output({url: summarized_results[url] for url in urls}))
+    return outputs
+
+def tavily_search_batch(calls_args: List[dict]) -> List[str]:
+    """一次执行同一轮中的多个 tavily_search 调用（同步版本）。
+
+    所有查询并发搜索后在全局范围按 URL 去重，只做一次批量摘要，
+    不同调用命中的同一网页只摘要一次。失败的查询按无结果处理。
+
+    参数：
+        calls_args: 各 tavily_search 工具调用的参数列表
+
+    返回值：
+        与调用一一对应的格式化搜索结果
+    """
+    client = get_tavily_client()
+
+    def search(args: dict) -> dict:
+        # 与异步版本一致：单个查询失败只让该调用无结果，不影响同一批次的其他调用
+        try:
+            return client.search(args["query"], **_search_kwargs(args))
+        except Exception as e:
+            logger.warning("搜索失败 (%s): %s", args["query"], e)
+            return {"results": []}
+
+    with ContextThreadPoolExecutor(max_workers=len(calls_args)) as pool:
+        responses = list(pool.map(search, calls_args))
+
+    summarized_results = process_search_results(deduplicate_search_results(responses))
+    return _slice_search_outputs(responses, summarized_results)
+
+async def atavily_search_batch(calls_args: List[dict]) -> List[str]:
+    """`tavily_search_batch` 的异步版本；失败的查询按无结果处理。"""
+    client = get_async_tavily_client()
+    results = await asyncio.gather(
+        *(client.search(args["query"], **_search_kwargs(args)) for args in calls_args),
+        return_exceptions=True,
+    )
+
+    responses = []
+    for args, result in zip(calls_args, results):
+        if isinstance(result, BaseException):
+            logger.warning("搜索失败 (%s): %s", args["query"], result)
+            result = {"results": []}
+        responses.append(result)
+
+    summarized_results = await aprocess_search_results(deduplicate_search_results(responses))
+    return _slice_search_outputs(responses, summarized_results)
+
+# ===== 工具调用执行 =====
+
+# 研究代理单次研究最多进行的 LLM 调用轮数；达到上限后不再执行工具，直接压缩已有结果
+MAX_TOOL_CALL_ITERATIONS = 15
+
+def reached_iteration_limit(state: dict) -> bool:
+    """研究代理是否已达到工具调用轮数上限。"""
+    return state.get("tool_call_iterations", 0) >= MAX_TOOL_CALL_ITERATIONS
+
+
+def _tool_messages(tool_calls: list, observations: list) -> List[ToolMessage]:
+    """按工具调用顺序创建工具消息输出。"""
+    return [
+        ToolMessage(
+            content=observation,
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"]
+        ) for observation, tool_call in zip(observations, tool_calls)
+    ]
+
+def _batched_search_indices(tools_by_name: dict, tool_calls: list) -> List[int]:
+    """同一轮中有多个 tavily_search 调用时返回它们的下标，交给批量搜索统一执行。"""
+    indices = [
+        i for i, tool_call in enumerate(tool_calls)
+        if tools_by_name.get(tool_call["name"]) is tavily_search
+    ]
+    return indices if len(indices) > 1 else []
+
+def run_tool_calls(tools_by_name: dict, tool_calls: list) -> List[ToolMessage]:
+    """执行一次 LLM 响应中的全部工具调用（同步版本）。
+
+    工具调用之间相互独立（网络搜索、文件读取），多个调用通过线程池并发执行，
+    结果顺序与 `tool_calls` 一致。同一轮中的多个 tavily_search 调用合并为一次
+    `tavily_search_batch`，共享去重和摘要批次。
+
+    参数：
+        tools_by_name: 工具名称到工具对象的映射
+        tool_calls: LLM 响应中的工具调用列表
+
+    返回值：
+        与工具调用一一对应的 ToolMessage 列表
+    """
+    batched = _batched_search_indices(tools_by_name, tool_calls)
+    single = [i for i in range(len(tool_calls)) if i not in batched]
+
+    jobs = [partial(tools_by_name[tool_calls[i]["name"]].invoke, tool_calls[i]["args"]) for i in single]
+    if batched:
+        jobs.append(partial(tavily_search_batch, [tool_calls[i]["args"] for i in batched]))
+
+    if len(jobs) <= 1:
+        results = [job() for job in jobs]
+    else:
+        # ContextThreadPoolExecutor 把当前 contextvars（节点的 RunnableConfig：回调、追踪、
+        # stream writer）复制到工作线程，并发执行的工具调用与单个调用一样可见
+        with ContextThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            results = list(pool.map(lambda job: job(), jobs))
+    return _tool_messages(tool_calls, _place_observations(len(tool_calls), single, batched, results))
+
+async def arun_tool_calls(tools_by_name: dict, tool_calls: list) -> List[ToolMessage]:
+    """`run_tool_calls` 的异步版本：通过 asyncio.gather 并发执行全部工具调用。
+
+    只有同步实现的工具（如 think_tool、文件读取）会由 `ainvoke` 放到线程中执行。
+    """
+    batched = _batched_search_indices(tools_by_name, tool_calls)
+    single = [i for i in range(len(tool_calls)) if i not in batched]
+
+    coros = [tools_by_name[tool_calls[i]["name"]].ainvoke(tool_calls[i]["args"]) for i in single]
+    if batched:
+        coros.append(atavily_search_batch([tool_calls[i]["args"] for i in batched]))
+
+    results = await asyncio.gather(*coros)
+    return _tool_messages(tool_calls, _place_observations(len(tool_calls), single, batched, results))
+
+def _place_observations(count: int, single: List[int], batched: List[int], results: list) -> list:
+    """把单独执行的结果和批量搜索的结果放回各自工具调用的位置。"""
+    observations = [None] * count
+    for i, observation in zip(single, results):
+        observations[i] = observation
+    if batched:
+        for i, observation in zip(batched, results[-1]):
+            observations[i] = observation
+    return observations
 
 # ===== 研究工具 =====
 
-@tool(parse_docstring=True)
-def tavily_search(
+def _tavily_search(
     query: str,
     max_results: Annotated[int, InjectedToolArg] = 3,
     topic: Annotated[Literal["general", "news", "finance"], InjectedToolArg] = "general",
@@ -212,6 +585,30 @@ def tavily_search(
     # 格式化输出以供使用
     return format_search_output(summarized_results)
 
+async def _atavily_search(
+    query: str,
+    max_results: Annotated[int, InjectedToolArg] = 3,
+    topic: Annotated[Literal["general", "news", "finance"], InjectedToolArg] = "general",
+) -> str:
+    """`tavily_search` 的异步实现（供 `ainvoke` 使用），不阻塞事件循环。"""
+    search_results = await atavily_search_multiple(
+        [query],
+        max_results=max_results,
+        topic=topic,
+        include_raw_content=True,
+    )
+    unique_results = deduplicate_search_results(search_results)
+    summarized_results = await aprocess_search_results(unique_results)
+    return format_search_output(summarized_results)
+
+# 同时提供同步与异步实现：`invoke` 走线程池版本，`ainvoke` 走 AsyncTavilyClient 版本
+tavily_search = StructuredTool.from_function(
+    func=_tavily_search,
+    coroutine=_atavily_search,
+    name="tavily_search",
+    parse_docstring=True,
+)
+
 @tool(parse_docstring=True)
 def think_tool(reflection: str) -> str:
     """用于研究进展战略性反思和决策的工具。